@@ -1,45 +1,236 @@
+import functools
+import os
+import re
+import threading
+import time
+from pathlib import Path
 import yfinance as yf
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 import streamlit as st
 
 
+# Yahoo Finance statements only change a few times a year; keep fetched data for an hour per session.
+_CACHE_TTL = 60 * 60
+# Fetches are network-bound, so threads overlap the waits; stay low enough to avoid Yahoo's 429s.
+_MAX_FETCH_WORKERS = 8
+# Shared cap on Yahoo statement requests in flight across every pool (outer ticker pools and the
+# per-ticker statement pool), so nesting pools never multiplies _MAX_FETCH_WORKERS.
+_FETCH_SLOTS = threading.BoundedSemaphore(_MAX_FETCH_WORKERS)
+# st.cache_data is in-memory only; fetched statements are also kept on disk so restarts and new
+# sessions don't go back to Yahoo within the TTL.
+_DISK_CACHE_DIR = Path(__file__).resolve().parent / ".yf_cache"
+# one parquet file per statement, in (balancesheet, financials, cashflow) order
+_DISK_CACHE_PARTS = ("balancesheet", "financials", "cashflow")
+
+
 def _safe_select_columns(df: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
     """Select columns defensively. Missing columns become NaN (no KeyError)."""
     return df.reindex(columns=cols)
 
+def _column(df: pd.DataFrame, col: str) -> pd.Series:
+    """Return df[col], or an all-NaN Series when Yahoo did not report that line item (no KeyError)."""
+    if col in df.columns:
+        return df[col]
+    return pd.Series(np.nan, index=df.index, name=col)
+
+def _safe_ratio(numerator: pd.Series, denominator: pd.Series) -> pd.Series:
+    """Divide two Series (aligned like `/`) in float32; a zero denominator gives NaN instead of inf."""
+    numerator, denominator = numerator.align(denominator)
+    num = numerator.to_numpy(np.float32, na_value=np.nan)
+    den = denominator.to_numpy(np.float32, na_value=np.nan)
+    out = np.full(num.shape, np.nan, dtype=np.float32)
+    np.divide(num, den, out=out, where=den != 0)
+    return pd.Series(out, index=numerator.index)
+
 def _first_existing(df: pd.DataFrame, candidates: list[str]) -> Optional[str]:
     for c in candidates:
         if c in df.columns:
             return c
     return None
 
+def _select_rows(statement: pd.DataFrame, rows: list[str]) -> pd.DataFrame:
+    """Keep the line items of a raw (line items x dates) statement that are present in rows, then transpose."""
+    # intersection rather than reindex so absent line items stay absent (the equity fallback relies on it)
+    return statement.loc[statement.index.intersection(rows)].T
+
+def _disk_cache_paths(ticker) -> list[Path]:
+    stem = re.sub(r"[^A-Za-z0-9.^=-]", "_", ticker)
+    return [_DISK_CACHE_DIR / f"{stem}.{part}.parquet" for part in _DISK_CACHE_PARTS]
+
+def _read_disk_cache(ticker):
+    """Return the cached statements for ticker, or None if any part is missing or older than the TTL."""
+    try:
+        paths = _disk_cache_paths(ticker)
+        if all(time.time() - path.stat().st_mtime < _CACHE_TTL for path in paths):
+            # parquet holds only data, so a tampered cache file can't run code the way a pickle can
+            return tuple(pd.read_parquet(path) for path in paths)
+    except Exception:
+        # a missing or unreadable entry just means fetching again
+        pass
+    return None
+
+def _write_disk_cache(ticker, statements) -> None:
+    try:
+        _DISK_CACHE_DIR.mkdir(exist_ok=True)
+        for path, statement in zip(_disk_cache_paths(ticker), statements):
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            statement.to_parquet(tmp)
+            # atomic rename so concurrent readers never see a partial file
+            os.replace(tmp, path)
+    except (OSError, pa.ArrowException):
+        # read-only deployments (or a frame Arrow can't store) simply run without the disk cache
+        pass
+
+# Per-thread flag raised while a _cache_complete function runs if any fetch under it came back empty.
+_fetch_state = threading.local()
+
+class _IncompleteFetch(Exception):
+    """Carries a result built from an empty Yahoo statement past st.cache_data, which never stores a raised result."""
+
+    def __init__(self, result):
+        super().__init__("Yahoo Finance returned an empty statement")
+        self.result = result
+
+def _cache_complete(func):
+    """st.cache_data for anything built from fetched statements, minus results built from an empty fetch.
+
+    Such a result is still returned, but it is not stored here, and every enclosing _cache_complete
+    function (including across _map_tickers threads) skips storing its own result as well.
+    """
+    def build(*args, **kwargs):
+        enclosing, _fetch_state.incomplete = getattr(_fetch_state, 'incomplete', False), False
+        try:
+            result = func(*args, **kwargs)
+            if _fetch_state.incomplete:
+                raise _IncompleteFetch(result)
+            return result
+        finally:
+            _fetch_state.incomplete = enclosing
+
+    cached = st.cache_data(ttl=_CACHE_TTL, show_spinner=False)(functools.wraps(func)(build))
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return cached(*args, **kwargs)
+        except _IncompleteFetch as incomplete:
+            _fetch_state.incomplete = True
+            return incomplete.result
+    return wrapper
+
+def _company_column(long_df: pd.DataFrame) -> pd.DataFrame:
+    """Move the Company level of a _long_frame result into a categorical column.
+
+    Categorical codes keep the column at one small integer per row and let groupby('Company') hash ints instead of strings.
+    """
+    df = long_df.reset_index(level='Company')
+    df['Company'] = df['Company'].astype('category')
+    return df
+
+def _map_tickers(func, listoftickers) -> list:
+    """Apply func to every ticker concurrently, returning results in ticker order."""
+    def run(ticker):
+        # worker threads have their own _fetch_state, so hand the incomplete flag back with the result
+        _fetch_state.incomplete = False
+        return func(ticker), _fetch_state.incomplete
+    with ThreadPoolExecutor(max_workers=max(1, min(_MAX_FETCH_WORKERS, len(listoftickers)))) as ex:
+        results = list(ex.map(run, listoftickers))
+    if any(incomplete for _, incomplete in results):
+        _fetch_state.incomplete = True
+    return [result for result, _ in results]
+
+def _long_frame(frames, listoftickers) -> pd.DataFrame:
+    """Stack per-ticker frames into one frame indexed by (Company, date) so arithmetic aligns within each company."""
+    return pd.concat(frames, keys=listoftickers, names=['Company', None])
+
+def _with_yoy_change(ratios: pd.DataFrame) -> pd.DataFrame:
+    """Sort a long ratio frame and append every column's YoY % change within each company from one grouped pct_change.
+
+    The get_Multiple*Ratios builders compute every company's ratios in one pass over the long frame, then call this,
+    and rank the result inside the same cached call so reruns get the ranking tables along with the ratios.
+    """
+    ratios = ratios.sort_index()
+    change = (ratios.groupby(level='Company').pct_change() * 100).round(2)
+    return ratios.join(change.add_suffix(' YoY Change'))
+
 import matplotlib.pyplot as plt
 import plotly.express as px
 
 
 
 ######################################################################## Functions to extract financials
-def get_Assets(balancesheet: pd.DataFrame):
-    """Return (current_assets_df, non_current_assets_df, total_assets_df)."""
-    current_Assets_columns = [
-        "Cash And Cash Equivalents",
-        "Other Short Term Investments",
-        "Accounts Receivable",
-        "Inventory",
-        "Other Current Assets",
-        "Current Assets",
-    ]
-    current_Assets = _safe_select_columns(balancesheet, current_Assets_columns)
+_CURRENT_ASSETS_COLUMNS = [
+    "Cash And Cash Equivalents",
+    "Other Short Term Investments",
+    "Accounts Receivable",
+    "Inventory",
+    "Other Current Assets",
+    "Current Assets",
+]
+_NON_CURRENT_ASSETS_COLUMNS = [
+    "Net PPE",
+    "Investments And Advances",
+    "Other Non Current Assets",
+    "Total Non Current Assets",
+]
+_CURRENT_LIABILITIES_COLUMNS = [
+    "Other Current Liabilities",
+    "Current Deferred Liabilities",
+    "Current Debt And Capital Lease Obligation",
+    "Payables And Accrued Expenses",
+    "Current Liabilities",
+]
+_NON_CURRENT_LIABILITIES_COLUMNS = [
+    "Other Non Current Liabilities",
+    "Long Term Debt And Capital Lease Obligation",
+    "Total Non Current Liabilities Net Minority Interest",
+]
+# Yahoo Finance equity naming varies across tickers/markets; the first candidate is the standardized name.
+_EQUITY_CANDIDATES = [
+    "Total Equity Gross Minority Interest",
+    "Stockholders Equity",
+    "Total Stockholder Equity",
+    "Common Stock Equity",
+    "Total Equity",
+]
+# Column layout of the complete balance sheet, in the same order as the split frames.
+_BS_ALL_COLUMNS = (
+    _CURRENT_ASSETS_COLUMNS
+    + _NON_CURRENT_ASSETS_COLUMNS
+    + ["Total Assets"]
+    + _CURRENT_LIABILITIES_COLUMNS
+    + _NON_CURRENT_LIABILITIES_COLUMNS
+    + ["Total Liabilities Net Minority Interest", _EQUITY_CANDIDATES[0]]
+)
+
+
+_FINANCIAL_COLUMNS=['Total Revenue','Gross Profit', 'Cost Of Revenue','Operating Income', 'Operating Expense','Other Non Operating Income Expenses',
+       'Tax Provision', 'Pretax Income','Net Income','Diluted NI Availto Com Stockholders','Net Interest Income', 'Interest Expense', 'Interest Income',
+       'Normalized Income',
+       'Net Income From Continuing And Discontinued Operation',
+       'Total Expenses', 
+       'Diluted Average Shares', 'Basic Average Shares', 'Diluted EPS',
+       'Basic EPS',
+       'Other Income Expense','Tax Effect Of Unusual Items', 'Tax Rate For Calcs',
+       'Normalized EBITDA',
+       'Net Income From Continuing Operation Net Minority Interest',
+       'Reconciled Depreciation', 'Reconciled Cost Of Revenue', 'EBITDA',
+       'EBIT',]
+_CASHFLOW_COLUMNS=['Free Cash Flow', 'Repurchase Of Capital Stock', 'Repayment Of Debt',
+       'Issuance Of Debt', 'Capital Expenditure','End Cash Position','Financing Cash Flow','Investing Cash Flow','Operating Cash Flow']
+# Every balance-sheet line item we read, including the equity fallbacks that get renamed later.
+_BS_ROWS = _BS_ALL_COLUMNS + _EQUITY_CANDIDATES[1:]
 
-    non_current_Assets_columns = [
-        "Net PPE",
-        "Investments And Advances",
-        "Other Non Current Assets",
-        "Total Non Current Assets",
-    ]
-    non_current_Assets = _safe_select_columns(balancesheet, non_current_Assets_columns)
 
+def get_Assets(balancesheet: pd.DataFrame):
+    """Return (current_assets_df, non_current_assets_df, total_assets_df)."""
+    current_Assets = _safe_select_columns(balancesheet, _CURRENT_ASSETS_COLUMNS)
+    non_current_Assets = _safe_select_columns(balancesheet, _NON_CURRENT_ASSETS_COLUMNS)
     total_Assets = _safe_select_columns(balancesheet, ["Total Assets"])
     return current_Assets, non_current_Assets, total_Assets
 
@@ -47,48 +238,64 @@ def get_Assets(balancesheet: pd.DataFrame):
 
 def get_Liabilities(balancesheet: pd.DataFrame):
     """Return (current_liabilities_df, non_current_liabilities_df, total_liabilities_df)."""
-    current_liabilities_columns = [
-        "Other Current Liabilities",
-        "Current Deferred Liabilities",
-        "Current Debt And Capital Lease Obligation",
-        "Payables And Accrued Expenses",
-        "Current Liabilities",
-    ]
-    current_Liabilities = _safe_select_columns(balancesheet, current_liabilities_columns)
-
-    non_current_liabilities_columns = [
-        "Other Non Current Liabilities",
-        "Long Term Debt And Capital Lease Obligation",
-        "Total Non Current Liabilities Net Minority Interest",
-    ]
-    non_current_Liabilities = _safe_select_columns(balancesheet, non_current_liabilities_columns)
-
+    current_Liabilities = _safe_select_columns(balancesheet, _CURRENT_LIABILITIES_COLUMNS)
+    non_current_Liabilities = _safe_select_columns(balancesheet, _NON_CURRENT_LIABILITIES_COLUMNS)
     total_Liabilities = _safe_select_columns(balancesheet, ["Total Liabilities Net Minority Interest"])
     return current_Liabilities, non_current_Liabilities, total_Liabilities
 
+def _standardize_equity(balancesheet: pd.DataFrame) -> pd.DataFrame:
+    """Rename the first available equity column to the standardized equity name."""
+    col = _first_existing(balancesheet, _EQUITY_CANDIDATES)
+    if col is None or col == _EQUITY_CANDIDATES[0]:
+        return balancesheet
+    return balancesheet.rename(columns={col: _EQUITY_CANDIDATES[0]})
+
 def get_Equity(balancesheet: pd.DataFrame) -> pd.DataFrame:
     """Return equity as a single standardized column.
 
     Yahoo Finance naming varies across tickers/markets, so we try common candidates.
     """
-    col = _first_existing(
-        balancesheet,
-        [
-            "Total Equity Gross Minority Interest",
-            "Stockholders Equity",
-            "Total Stockholder Equity",
-            "Common Stock Equity",
-            "Total Equity",
-        ],
-    )
+    col = _first_existing(balancesheet, _EQUITY_CANDIDATES)
     if col is None:
-        return pd.DataFrame(index=balancesheet.index, columns=["Total Equity Gross Minority Interest"])
-    return balancesheet[[col]].rename(columns={col: "Total Equity Gross Minority Interest"})
-
-def extract_balance_sheet(ticker):
-    stock=yf.Ticker(ticker)
-# extract balance sheet for the company
-    balancesheet=stock.balancesheet.T
+        return pd.DataFrame(index=balancesheet.index, columns=[_EQUITY_CANDIDATES[0]])
+    return balancesheet[[col]].rename(columns={col: _EQUITY_CANDIDATES[0]})
+
+# yf.Ticker statement attribute -> line items kept from it, in (balancesheet, financials, cashflow) order
+_STATEMENT_ROWS = (
+    ("balancesheet", _BS_ROWS),
+    ("financials", _FINANCIAL_COLUMNS),
+    ("cashflow", _CASHFLOW_COLUMNS),
+)
+
+def _fetch_statement(stock, attribute: str, rows: list[str]) -> pd.DataFrame:
+    """Read one statement off a yf.Ticker (one Yahoo request) while holding a _FETCH_SLOTS slot."""
+    with _FETCH_SLOTS:
+        statement = getattr(stock, attribute)
+    return _select_rows(statement, rows)
+
+@_cache_complete
+def _fetch_all(ticker):
+    """Return (balancesheet, financials, cashflow) for a ticker from a single yf.Ticker.
+
+    Each statement is transposed so the index is the reporting date and the columns are line items.
+    Only the line items this module reads are kept, and they are selected before the transpose so
+    only the narrow frame gets copied. Complete results are also read from / written to the on-disk
+    cache; a result with an empty statement is returned but kept out of every cache.
+    """
+    statements = _read_disk_cache(ticker)
+    if statements is not None:
+        return statements
+    stock = yf.Ticker(ticker)
+    # each statement is its own Yahoo request, so issue the three together instead of back to back
+    with ThreadPoolExecutor(max_workers=len(_STATEMENT_ROWS)) as ex:
+        statements = tuple(ex.map(lambda item: _fetch_statement(stock, *item), _STATEMENT_ROWS))
+    # yfinance hides fetch errors and hands back an empty frame; never persist or memoize those
+    if any(statement.index.empty for statement in statements):
+        raise _IncompleteFetch(statements)
+    _write_disk_cache(ticker, statements)
+    return statements
+
+def _split_balance_sheet(balancesheet: pd.DataFrame):
     #extract Assets dataframes
     current_Assets, non_current_Assets,total_Assets=get_Assets(balancesheet)
     #extract Liabilities dataframes
@@ -98,92 +305,104 @@ def extract_balance_sheet(ticker):
     return current_Assets, non_current_Assets,total_Assets,current_Liabilities,non_current_Liabilities,total_Liabilities,total_ShareHolderEquity
 
 
+@_cache_complete
+def extract_balance_sheet(ticker):
+    # extract balance sheet for the company
+    balancesheet, _, _ = _fetch_all(ticker)
+    return _split_balance_sheet(balancesheet)
 
 
+def _select_total_revenue(financial: pd.DataFrame) -> pd.DataFrame:
+    return _safe_select_columns(financial, ['Total Revenue'])
 
+
+@_cache_complete
 def get_TotalRevenue(ticker):
-    financial=yf.Ticker(ticker)
-    financial=financial.financials.T
-    total_Revenue = pd.DataFrame({
-    'Total Revenue': financial['Total Revenue']
-    
-})
-    return total_Revenue
+    _, financial, _ = _fetch_all(ticker)
+    return _select_total_revenue(financial)
 
 
+def _select_financial(financial: pd.DataFrame) -> pd.DataFrame:
+       return _safe_select_columns(financial, _FINANCIAL_COLUMNS)
+
+
+@_cache_complete
 def get_Financial(ticker):
-       stock=yf.Ticker(ticker)
-       # extract balance sheet for the company
-       financial=stock.financials.T
-       financialcolumns=['Total Revenue','Gross Profit', 'Cost Of Revenue','Operating Income', 'Operating Expense','Other Non Operating Income Expenses',
-       'Tax Provision', 'Pretax Income','Net Income','Diluted NI Availto Com Stockholders','Net Interest Income', 'Interest Expense', 'Interest Income',
-       'Normalized Income',
-       'Net Income From Continuing And Discontinued Operation',
-       'Total Expenses', 
-       'Diluted Average Shares', 'Basic Average Shares', 'Diluted EPS',
-       'Basic EPS',
-       'Other Income Expense','Tax Effect Of Unusual Items', 'Tax Rate For Calcs',
-       'Normalized EBITDA',
-       'Net Income From Continuing Operation Net Minority Interest',
-       'Reconciled Depreciation', 'Reconciled Cost Of Revenue', 'EBITDA',
-       'EBIT',]
-       financial = _safe_select_columns(financial, financialcolumns)
-       return financial
+       # extract financial statement for the company
+       _, financial, _ = _fetch_all(ticker)
+       return _select_financial(financial)
+
 
 
+@_cache_complete
+def _per_ticker_bundle(ticker):
+    """Return (balance sheet frames, financial statement, cash flow statement) for a ticker.
+
+    The ratio builders all read from this bundle so one rerun fetches and selects each ticker's statements once.
+    """
+    balancesheet, financial, cashflow = _fetch_all(ticker)
+    return _split_balance_sheet(balancesheet), _select_financial(financial), _select_cashflow(cashflow)
+
+@_cache_complete
 def get_MultipleFinancial(listoftickers):
-    df_list=[]
-    for i in range(len(listoftickers)):
-        df=get_Financial(listoftickers[i])
-        df['Company'] = [listoftickers[i]] * len(df)
-        df_list.append(df) 
-    multiple_Financial = pd.concat(df_list, ignore_index=False)
+    _, multiple_Financial, _ = get_AllStatements(listoftickers)
     return multiple_Financial     
 
 
+def _select_cashflow(cashflow: pd.DataFrame) -> pd.DataFrame:
+       return _safe_select_columns(cashflow, _CASHFLOW_COLUMNS)
+
+
+@_cache_complete
 def get_CashFLow(ticker):
-       stock=yf.Ticker(ticker)
-       # extract balance sheet for the company
-       cashflow=stock.cashflow.T
-       cashflowcolumns=['Free Cash Flow', 'Repurchase Of Capital Stock', 'Repayment Of Debt',
-              'Issuance Of Debt', 'Capital Expenditure','End Cash Position','Financing Cash Flow','Investing Cash Flow','Operating Cash Flow']
-       cashflow = _safe_select_columns(cashflow, cashflowcolumns)
-       return cashflow
+       # extract cash flow statement for the company
+       _, _, cashflow = _fetch_all(ticker)
+       return _select_cashflow(cashflow)
 
 
+@_cache_complete
 def get_MultipleCashFlow(listoftickers):
-    df_list=[]
-    for i in range(len(listoftickers)):
-        df=get_CashFLow(listoftickers[i])
-        df['Company'] = [listoftickers[i]] * len(df)
-        df_list.append(df)
-    
-    multiple_CahsFlow = pd.concat(df_list, ignore_index=False)
+    _, _, multiple_CahsFlow = get_AllStatements(listoftickers)
 
     return multiple_CahsFlow      
 
 
+def _complete_balance_sheet(balancesheet: pd.DataFrame) -> pd.DataFrame:
+        # one reindex builds the whole frame instead of concatenating the seven split frames
+        return _standardize_equity(balancesheet).reindex(columns=_BS_ALL_COLUMNS)
+
+
 def get_CompleteBalancesheet(ticker):
-        
-        current_Assets, non_current_Assets,total_Assets,current_Liabilities,non_current_Liabilities,total_Liabilities,total_ShareHolderEquity=extract_balance_sheet(ticker)
-        result_df = pd.concat([current_Assets, non_current_Assets, total_Assets,
-                          current_Liabilities, non_current_Liabilities, total_Liabilities,
-                          total_ShareHolderEquity], axis=1)
-        return result_df
+        balancesheet, _, _ = _fetch_all(ticker)
+        return _complete_balance_sheet(balancesheet)
 
 
+@_cache_complete
 def get_MultipleBalanceSheet(listoftickers):
-    df_list=[]
-    for i in range(len(listoftickers)):
-        df=get_CompleteBalancesheet(listoftickers[i])
-        df['Company'] = [listoftickers[i]] * len(df)
-        df_list.append(df)
-    
-    multiple_BalanceSheets = pd.concat(df_list, ignore_index=False)
+    multiple_BalanceSheets, _, _ = get_AllStatements(listoftickers)
 
     return multiple_BalanceSheets      
 
 
+def _statements_for_ticker(ticker):
+    balancesheet, financial, cashflow = _fetch_all(ticker)
+    return _complete_balance_sheet(balancesheet), _select_financial(financial), _select_cashflow(cashflow)
+
+
+@_cache_complete
+def get_AllStatements(listoftickers):
+    """Return (balance sheets, financial statements, cash flow statements) for all tickers.
+
+    Each ticker is fetched once (concurrently across tickers) and all three long-form statements are built
+    from that fetch; rows are tagged via concat keys instead of adding a Company column to every frame.
+    """
+    statements=_map_tickers(_statements_for_ticker, listoftickers)
+    return tuple(
+        _company_column(_long_frame([ticker_statements[k] for ticker_statements in statements], listoftickers))
+        for k in range(3)
+    )
+
+
 
 ######################################################################## Functions to calculate Ratios
 
@@ -192,7 +411,7 @@ def get_CurrentRatio(current_Assets,current_Liabilities):
     """This function calculates the Current Ratio for each year in the balance sheet
     """
     current_Ratio = pd.DataFrame({
-    'Current Ratio': current_Assets['Current Assets'] / current_Liabilities['Current Liabilities'],
+    'Current Ratio': _safe_ratio(_column(current_Assets, 'Current Assets'), _column(current_Liabilities, 'Current Liabilities')),
     
 })
     return current_Ratio
@@ -203,7 +422,7 @@ def get_DebttoEquityRatio(total_Liabilities, total_ShareHolderEquity):
     """This function calculates the Debt to Equity Ratio for each year in the balance sheet"""
     
     debt_to_equity_ratio = pd.DataFrame({
-        'Debt_to_Equity_Ratio': total_Liabilities['Total Liabilities Net Minority Interest'] / total_ShareHolderEquity['Total Equity Gross Minority Interest']
+        'Debt_to_Equity_Ratio': _safe_ratio(_column(total_Liabilities, 'Total Liabilities Net Minority Interest'), _column(total_ShareHolderEquity, 'Total Equity Gross Minority Interest'))
     })
     
     return debt_to_equity_ratio
@@ -215,7 +434,7 @@ def get_EquityMultiplierRatio(total_Assets,total_ShareHolderEquity):
     """This function calculates the equity multiplier ratio for each year in the balance sheet"""
     
     equity_multiplier_ratio = pd.DataFrame({
-        'Equity_Multiplier_Ratio': total_Assets['Total Assets'] / total_ShareHolderEquity['Total Equity Gross Minority Interest']
+        'Equity_Multiplier_Ratio': _safe_ratio(_column(total_Assets, 'Total Assets'), _column(total_ShareHolderEquity, 'Total Equity Gross Minority Interest'))
     })
     return equity_multiplier_ratio
 
@@ -225,7 +444,7 @@ def get_DebttoAssetsRatio(total_Liabilities,total_Assets):
     """This function calculates the Debt to assets ratio for each year in the balance sheet"""
     
     debt_to_assets_ratio = pd.DataFrame({
-        'Debt_To_Assets_Ratio':total_Liabilities['Total Liabilities Net Minority Interest'] /total_Assets['Total Assets']
+        'Debt_To_Assets_Ratio':_safe_ratio(_column(total_Liabilities, 'Total Liabilities Net Minority Interest'), _column(total_Assets, 'Total Assets'))
     })
     return debt_to_assets_ratio
 
@@ -233,6 +452,7 @@ def get_DebttoAssetsRatio(total_Liabilities,total_Assets):
 
 
 
+@_cache_complete
 def get_WholeRatio(listoftickers):
     current_ratio_comparison,debt_to_equity_ratio_comparison,equity_multiplier_ratio_comparison,debt_to_assets_ratio_comparison,asset_turnover_ratio_comparison,cash_flow_to_net_income_Ratio_comparison,operating_cash_flow_Ratio_comparison= get_RatiosofMultipleCompanies(listoftickers)
     dfs = [current_ratio_comparison,debt_to_equity_ratio_comparison,equity_multiplier_ratio_comparison,debt_to_assets_ratio_comparison,asset_turnover_ratio_comparison,cash_flow_to_net_income_Ratio_comparison,operating_cash_flow_Ratio_comparison]
@@ -244,7 +464,7 @@ def get_AssetTurnoverRatio(total_Revenue,total_Assets):
     """This function calculates the Asset Turnover Ratio Ratio for each year in the balance sheet
     """
     asset_turnover_Ratio = pd.DataFrame({
-    'Asset Turnover Ratio': total_Revenue['Total Revenue']/ total_Assets['Total Assets']
+    'Asset Turnover Ratio': _safe_ratio(_column(total_Revenue, 'Total Revenue'), _column(total_Assets, 'Total Assets'))
     
 })
     return asset_turnover_Ratio
@@ -254,7 +474,7 @@ def get_CashFlowtoNetIncomeRatio(cashflow,financial):
     """This function calculates the CashFlowtoNetIncomeRatio for each year in the balance sheet
     """
     cash_flow_to_net_income_Ratio = pd.DataFrame({
-    'Cash Flow to Income Ratio': cashflow['Operating Cash Flow']/ financial['Net Income']
+    'Cash Flow to Income Ratio': _safe_ratio(_column(cashflow, 'Operating Cash Flow'), _column(financial, 'Net Income'))
     
 })
     return cash_flow_to_net_income_Ratio
@@ -263,81 +483,54 @@ def get_OperatingCashFlowRatio(cashflow,current_Liabilities):
     """This function calculates the Operating Cashflow Ratiofor each year in the balance sheet
     """
     operating_cash_flow_Ratio = pd.DataFrame({
-    'Operating Cash Flow Ratio': cashflow['Operating Cash Flow']/ current_Liabilities['Current Liabilities']
+    'Operating Cash Flow Ratio': _safe_ratio(_column(cashflow, 'Operating Cash Flow'), _column(current_Liabilities, 'Current Liabilities'))
     
 })
     return operating_cash_flow_Ratio
 
+@_cache_complete
 def get_RatiosofMultipleCompanies(listoftickers):
     """The purpose of this function is to calculate the different ratios for a series of companies and concatenate the results
     """
-    #create empty list to store the different dfs of ratios
-    current_ratio_list=[]
-    debt_to_equity_ratio_list=[]
-    equity_multiplier_ratio_list=[]
-    debt_to_assets_ratio_list=[]
-    asset_turnover_Ratio_list=[]
-    cash_flow_to_net_income_Ratio_list=[]
-    operating_cash_flow_Ratio_list=[]
-    for i in range(len(listoftickers)):
-        #generate balance sheets for each ticker
-       
-        current_Assets, non_current_Assets,total_Assets,current_Liabilities,non_current_Liabilities,total_Liabilities,total_ShareHolderEquity=extract_balance_sheet(listoftickers[i])
-        total_Revenue=get_TotalRevenue(listoftickers[i])
-        financial=get_Financial(listoftickers[i])
-        cashflow=get_CashFLow(listoftickers[i])
-        
-        #get ratios
-        current_Ratio=get_CurrentRatio(current_Assets,current_Liabilities)
-        debt_to_equity_Ratio=get_DebttoEquityRatio(total_Liabilities, total_ShareHolderEquity)
-        equity_multiplier_Ratio= get_EquityMultiplierRatio(total_Assets,total_ShareHolderEquity)
-        debt_to_assets_Ratio= get_DebttoAssetsRatio(total_Liabilities,total_Assets)
-        asset_turnover_Ratio=get_AssetTurnoverRatio(total_Revenue,total_Assets)
-        cash_flow_to_net_income_Ratio=get_CashFlowtoNetIncomeRatio(cashflow,financial)
-        operating_cash_flow_Ratio=get_OperatingCashFlowRatio(cashflow,current_Liabilities)
-        #generate new column to identify the company's ratios
-        current_Ratio['Company'] = [listoftickers[i]] * len(current_Ratio)
-        current_ratio_list.append(current_Ratio)
-        debt_to_equity_Ratio['Company'] = [listoftickers[i]] * len(current_Ratio)
-        debt_to_equity_ratio_list.append(debt_to_equity_Ratio)
-        equity_multiplier_Ratio['Company'] = [listoftickers[i]] * len(current_Ratio)
-        equity_multiplier_ratio_list.append(equity_multiplier_Ratio)
-        debt_to_assets_Ratio['Company'] = [listoftickers[i]] * len(current_Ratio)
-        debt_to_assets_ratio_list.append(debt_to_assets_Ratio)
-        asset_turnover_Ratio['Company'] = [listoftickers[i]] * len(current_Ratio)
-        asset_turnover_Ratio_list.append(asset_turnover_Ratio)
-        cash_flow_to_net_income_Ratio['Company'] = [listoftickers[i]] * len(current_Ratio)
-        cash_flow_to_net_income_Ratio_list.append(cash_flow_to_net_income_Ratio)
-        operating_cash_flow_Ratio['Company'] = [listoftickers[i]] * len(current_Ratio)
-        operating_cash_flow_Ratio_list.append(operating_cash_flow_Ratio)
-
-
-
-    #concat all dfs of every ratio
-    current_ratio_comparison = pd.concat(current_ratio_list, ignore_index=False)
-    debt_to_equity_ratio_comparison = pd.concat(debt_to_equity_ratio_list, ignore_index=False)
-    equity_multiplier_ratio_comparison = pd.concat(equity_multiplier_ratio_list, ignore_index=False)
-    debt_to_assets_ratio_comparison=pd.concat(debt_to_assets_ratio_list, ignore_index=False)
-    asset_turnover_ratio_comparison=pd.concat(asset_turnover_Ratio_list, ignore_index=False)
-    cash_flow_to_net_income_Ratio_comparison=pd.concat(cash_flow_to_net_income_Ratio_list, ignore_index=False)
-    operating_cash_flow_Ratio_comparison=pd.concat(operating_cash_flow_Ratio_list, ignore_index=False)
-
+    #fetch all three statements for every ticker concurrently
+    bundles=_map_tickers(_per_ticker_bundle, listoftickers)
+    #stack each statement across tickers so every ratio is one vectorized divide over all companies
+    current_Assets, total_Assets, current_Liabilities, total_Liabilities, total_ShareHolderEquity=[
+        _long_frame([bundle[0][part] for bundle in bundles], listoftickers) for part in (0, 2, 3, 5, 6)
+    ]
+    financial=_long_frame([bundle[1] for bundle in bundles], listoftickers)
+    cashflow=_long_frame([bundle[2] for bundle in bundles], listoftickers)
+    total_Revenue=_select_total_revenue(financial)
+
+    #get ratios
+    ratios=[
+        get_CurrentRatio(current_Assets,current_Liabilities),
+        get_DebttoEquityRatio(total_Liabilities, total_ShareHolderEquity),
+        get_EquityMultiplierRatio(total_Assets,total_ShareHolderEquity),
+        get_DebttoAssetsRatio(total_Liabilities,total_Assets),
+        get_AssetTurnoverRatio(total_Revenue,total_Assets),
+        get_CashFlowtoNetIncomeRatio(cashflow,financial),
+        get_OperatingCashFlowRatio(cashflow,current_Liabilities),
+    ]
+    #move the company level back into a column to identify the company's ratios
+    current_ratio_comparison,debt_to_equity_ratio_comparison,equity_multiplier_ratio_comparison,debt_to_assets_ratio_comparison,asset_turnover_ratio_comparison,cash_flow_to_net_income_Ratio_comparison,operating_cash_flow_Ratio_comparison=[
+        _company_column(ratio)[[*ratio.columns, 'Company']] for ratio in ratios
+    ]
 
     return current_ratio_comparison,debt_to_equity_ratio_comparison,equity_multiplier_ratio_comparison,debt_to_assets_ratio_comparison,asset_turnover_ratio_comparison,cash_flow_to_net_income_Ratio_comparison,operating_cash_flow_Ratio_comparison
 
+def _relative_difference(df: pd.DataFrame, ratio: str) -> pd.DataFrame:
+    """Return a copy of df with the yearly cross-company mean of ratio and each company's relative difference to it."""
+    comparison = df.groupby(df.index.year)[ratio].transform('mean')
+    return df.assign(**{'Comparison Ratio': comparison, 'Relative_Difference': df[ratio] / comparison - 1})
+
 def get_RelativeDifferenceofRatio(listoftickers):
     """The purpose of this function is to calculate the relative difference of a series of companies by year to compare how each performed in the difference metrics in comparison
     to each other"""
     current_ratio_comparison,debt_to_equity_ratio_comparison,equity_multiplier_ratio_comparison,debt_to_assets_ratio_comparison,asset_turnover_ratio_comparison,cash_flow_to_net_income_Ratio_comparison,operating_cash_flow_Ratio_comparison= get_RatiosofMultipleCompanies(listoftickers)
     dflist=[current_ratio_comparison,debt_to_equity_ratio_comparison,equity_multiplier_ratio_comparison,debt_to_assets_ratio_comparison,asset_turnover_ratio_comparison,cash_flow_to_net_income_Ratio_comparison,operating_cash_flow_Ratio_comparison]
     ratio_list=['Current Ratio','Debt_to_Equity_Ratio','Equity_Multiplier_Ratio','Debt_To_Assets_Ratio','Asset Turnover Ratio','Cash Flow to Income Ratio', 'Operating Cash Flow Ratio']
-    new_df_list=[]
-    for i in range(len(dflist)):
-        df=dflist[i]
-        df['Year'] = df.index.year
-        df['Comparison Ratio']=df.groupby('Year')[ratio_list[i]].transform('mean')
-        df["Relative_Difference"]=(df[ratio_list[i]]/df['Comparison Ratio'])-1
-        new_df_list.append(df)
+    new_df_list=[_relative_difference(df, ratio) for df, ratio in zip(dflist, ratio_list)]
     
     current_ratio_relative_difference=new_df_list[0]
     debt_to_equity_ratio_relative_difference=new_df_list[1]
@@ -345,7 +538,7 @@ def get_RelativeDifferenceofRatio(listoftickers):
     debt_to_assets_ratio_relative_difference=new_df_list[3]
     asset_turnover_ratio_relative_difference=new_df_list[4]
     cash_flow_to_net_income_relative_difference=new_df_list[5]
-    operating_cash_flow_Ratio_relative_difference=new_df_list[5]
+    operating_cash_flow_Ratio_relative_difference=new_df_list[6]
 
 
 
@@ -356,7 +549,7 @@ def get_GrossProfitMargin(financial):
     """This function calculates the Gross Profit Margin for each year in the balance sheet
     """
     gross_profit_Margin = pd.DataFrame({
-    'Gross Profit Margin': (financial['Gross Profit']/ financial['Total Revenue'])*100
+    'Gross Profit Margin': _safe_ratio(_column(financial, 'Gross Profit'), _column(financial, 'Total Revenue'))*100
     
 })
     return gross_profit_Margin
@@ -365,105 +558,80 @@ def get_OperatingProfit_Margin(financial):
     """This function calculates the Operating Profit Margin for each year in the balance sheet
     """
     operating_profit_Margin = pd.DataFrame({
-    'Operating Profit Margin': (financial['EBIT']/ financial['Total Revenue'])*100
+    'Operating Profit Margin': _safe_ratio(_column(financial, 'EBIT'), _column(financial, 'Total Revenue'))*100
     
 })
     return operating_profit_Margin
 
 
+@_cache_complete
 def get_MultipleProfitabilityRatios(listoftickers):
-    
-    listofdfs=[]
-    for i in range(len(listoftickers)):
-        financial=get_Financial(listoftickers[i])
-        gross_profit_Margin=get_GrossProfitMargin(financial)
-        gross_profit_Margin = gross_profit_Margin.sort_index()
-        gross_profit_Margin['Gross Profit Margin YoY Change']=round(gross_profit_Margin['Gross Profit Margin'].pct_change() * 100,2)
-        operating_profit_Margin=get_OperatingProfit_Margin(financial)
-        operating_profit_Margin = operating_profit_Margin.sort_index()
-        operating_profit_Margin['Operating Profit Margin YoY Change'] = round(operating_profit_Margin['Operating Profit Margin'].pct_change() * 100,2)
-        operating_profit_Margin['Company'] = [listoftickers[i]] * len(operating_profit_Margin)
-        df=pd.concat([operating_profit_Margin,gross_profit_Margin],axis=1)
-        listofdfs.append(df)
-    
-    profitabilityRatios = pd.concat(listofdfs, axis=0)
-    return profitabilityRatios
+    bundles=_map_tickers(_per_ticker_bundle, listoftickers)
+    financial=_long_frame([bundle[1] for bundle in bundles], listoftickers)
+    profitabilityRatios=_with_yoy_change(pd.concat([get_OperatingProfit_Margin(financial), get_GrossProfitMargin(financial)], axis=1))
+    profitabilityRatios=_company_column(profitabilityRatios)[['Operating Profit Margin','Operating Profit Margin YoY Change','Company','Gross Profit Margin','Gross Profit Margin YoY Change']]
+    return (profitabilityRatios, *get_RankingTableProfitability(profitabilityRatios))
+
+
+def _last_two_years(df: pd.DataFrame) -> pd.DataFrame:
+    """Return the rows of df dated within two years of its latest date."""
+    if df.empty or not isinstance(df.index, pd.DatetimeIndex) or df.index.isna().all():
+        # nothing dated to rank, e.g. every selected ticker came back empty
+        return df.iloc[:0]
+    df = df.sort_index()
+    cutoff = df.index.max() - pd.DateOffset(years=2)
+    # the index is sorted, so a label slice replaces a full boolean mask
+    return df.loc[cutoff:]
+
+
+def _rank_by_mean(df: pd.DataFrame, columns: list[str]) -> list[pd.DataFrame]:
+    """Return one best-to-worst ranking of companies per column, from a single groupby mean over all columns."""
+    means = df.groupby('Company', observed=True)[columns].mean().reset_index()
+    return [means[['Company', col]].sort_values(by=col, ascending=False) for col in columns]
 
 
 def get_RankingTableProfitability(profitability):
-    df = profitability.sort_index()
     # Extract the last two years
-    last_two_years = df[df.index >= (df.index.max() - pd.DateOffset(years=2))]
-    # Calculate the mean Gross Profit Margin YoY Change for each company
-    gross_proffitmean_yoy_change_by_company = last_two_years.groupby('Company')['Gross Profit Margin YoY Change'].mean()
-    gross_proffitmean_yoy_change_by_company = gross_proffitmean_yoy_change_by_company.reset_index()
-    gross_proffitmean_yoy_change_by_company = gross_proffitmean_yoy_change_by_company.sort_values(by='Gross Profit Margin YoY Change', ascending=False)
-    operating_proffitmean_yoy_change_by_company=last_two_years.groupby('Company')['Operating Profit Margin YoY Change'].mean()
-    operating_proffitmean_yoy_change_by_company = operating_proffitmean_yoy_change_by_company.reset_index()
-    operating_proffitmean_yoy_change_by_company = operating_proffitmean_yoy_change_by_company.sort_values(by='Operating Profit Margin YoY Change', ascending=False)
+    last_two_years = _last_two_years(profitability)
+    # Calculate the mean Gross and Operating Profit Margin YoY Change for each company
+    gross_proffitmean_yoy_change_by_company,operating_proffitmean_yoy_change_by_company=_rank_by_mean(last_two_years, ['Gross Profit Margin YoY Change','Operating Profit Margin YoY Change'])
 
     return gross_proffitmean_yoy_change_by_company,operating_proffitmean_yoy_change_by_company
     
 
 
+@_cache_complete
 def get_MultipleLiquidityRatios(listoftickers):
-    listofdfs=[]
-    for i in range(len(listoftickers)):
-        current_Assets, non_current_Assets,total_Assets,current_Liabilities,non_current_Liabilities,total_Liabilities,total_ShareHolderEquity=extract_balance_sheet(listoftickers[i])
-        cashflow=get_CashFLow(listoftickers[i])
-        current_Ratio=get_CurrentRatio(current_Assets,current_Liabilities)
-        current_Ratio = current_Ratio.sort_index()
-        current_Ratio['Current Ratio YoY Change']=round(current_Ratio['Current Ratio'].pct_change() * 100,2)
-        operating_cash_flow_Ratio=get_OperatingCashFlowRatio(cashflow,current_Liabilities)
-        operating_cash_flow_Ratio = operating_cash_flow_Ratio.sort_index()
-        operating_cash_flow_Ratio['Operating Cash Flow Ratio YoY Change']=round(operating_cash_flow_Ratio['Operating Cash Flow Ratio'].pct_change() * 100,2)
-        operating_cash_flow_Ratio['Company'] = [listoftickers[i]] * len(operating_cash_flow_Ratio)
-        df=pd.concat([current_Ratio,operating_cash_flow_Ratio],axis=1)
-        listofdfs.append(df)        
-    liquidityRatios = pd.concat(listofdfs, axis=0)
-    return liquidityRatios
+    bundles=_map_tickers(_per_ticker_bundle, listoftickers)
+    current_Assets=_long_frame([bundle[0][0] for bundle in bundles], listoftickers)
+    current_Liabilities=_long_frame([bundle[0][3] for bundle in bundles], listoftickers)
+    cashflow=_long_frame([bundle[2] for bundle in bundles], listoftickers)
+    liquidityRatios=_with_yoy_change(pd.concat([get_CurrentRatio(current_Assets,current_Liabilities), get_OperatingCashFlowRatio(cashflow,current_Liabilities)], axis=1))
+    liquidityRatios=_company_column(liquidityRatios)[['Current Ratio','Current Ratio YoY Change','Operating Cash Flow Ratio','Operating Cash Flow Ratio YoY Change','Company']]
+    return (liquidityRatios, *get_RankingTableLiquidity(liquidityRatios))
 
 
 def get_RankingTableLiquidity(liquidity):
-    df = liquidity.sort_index()
     # Extract the last two years
-    last_two_years = df[df.index >= (df.index.max() - pd.DateOffset(years=2))]
-    # Calculate the mean Gross Profit Margin YoY Change for each company
-    current_ratio_Ranking = last_two_years.groupby('Company')['Current Ratio'].mean()
-    current_ratio_Ranking = current_ratio_Ranking.reset_index()
-    current_ratio_Ranking = current_ratio_Ranking.sort_values(by='Current Ratio', ascending=False)
-    operating_cash_flow_ratio_Ranking=last_two_years.groupby('Company')['Operating Cash Flow Ratio'].mean()
-    operating_cash_flow_ratio_Ranking = operating_cash_flow_ratio_Ranking.reset_index()
-    operating_cash_flow_ratio_Ranking = operating_cash_flow_ratio_Ranking.sort_values(by='Operating Cash Flow Ratio', ascending=False)
+    last_two_years = _last_two_years(liquidity)
+    # Calculate the mean Current Ratio and Operating Cash Flow Ratio for each company
+    current_ratio_Ranking,operating_cash_flow_ratio_Ranking=_rank_by_mean(last_two_years, ['Current Ratio','Operating Cash Flow Ratio'])
     return current_ratio_Ranking,operating_cash_flow_ratio_Ranking
 
+@_cache_complete
 def get_MultipleEfficiencyRatios(listoftickers):
-    listofdfs=[]
-    for i in range(len(listoftickers)):
-        cashflow=get_CashFLow(listoftickers[i])
-        financial=get_Financial(listoftickers[i])
-
-        cash_flow_to_net_income_Ratio=get_CashFlowtoNetIncomeRatio(cashflow,financial)
-        cash_flow_to_net_income_Ratio = cash_flow_to_net_income_Ratio.sort_index()
-        cash_flow_to_net_income_Ratio['Cash Flow to Income Ratio YoY Change']=round(cash_flow_to_net_income_Ratio['Cash Flow to Income Ratio'].pct_change() * 100,2)
-        cash_flow_to_net_income_Ratio['Company'] = [listoftickers[i]] * len(cash_flow_to_net_income_Ratio)
-        listofdfs.append(cash_flow_to_net_income_Ratio)
-
-    efficiency = pd.concat(listofdfs, axis=0)
-    return efficiency
+    bundles=_map_tickers(_per_ticker_bundle, listoftickers)
+    financial=_long_frame([bundle[1] for bundle in bundles], listoftickers)
+    cashflow=_long_frame([bundle[2] for bundle in bundles], listoftickers)
+    efficiency=_with_yoy_change(get_CashFlowtoNetIncomeRatio(cashflow,financial))
+    efficiency=_company_column(efficiency)[['Cash Flow to Income Ratio','Cash Flow to Income Ratio YoY Change','Company']]
+    return (efficiency, *get_RankingTableEfficiency(efficiency))
 
 def get_RankingTableEfficiency(efficiency):
-    df = efficiency.sort_index()
     # Extract the last two years
-    last_two_years = df[df.index >= (df.index.max() - pd.DateOffset(years=2))]
-    # Calculate the mean Gross Profit Margin YoY Change for each company
-    cash_flow_to_net_income_Ratio_Ranking = last_two_years.groupby('Company')['Cash Flow to Income Ratio'].mean()
-    cash_flow_to_net_income_Ratio_Ranking = cash_flow_to_net_income_Ratio_Ranking.reset_index()
-    cash_flow_to_net_income_Ratio_Ranking = cash_flow_to_net_income_Ratio_Ranking.sort_values(by='Cash Flow to Income Ratio', ascending=False)
-
-    asset_turnover_Ratio_Ranking=last_two_years.groupby('Company')['Cash Flow to Income Ratio YoY Change'].mean()
-    asset_turnover_Ratio_Ranking = asset_turnover_Ratio_Ranking.reset_index()
-    asset_turnover_Ratio_Ranking = asset_turnover_Ratio_Ranking.sort_values(by='Cash Flow to Income Ratio YoY Change', ascending=False)
+    last_two_years = _last_two_years(efficiency)
+    # Calculate the mean Cash Flow to Income Ratio and its YoY Change for each company
+    cash_flow_to_net_income_Ratio_Ranking,asset_turnover_Ratio_Ranking=_rank_by_mean(last_two_years, ['Cash Flow to Income Ratio','Cash Flow to Income Ratio YoY Change'])
     return cash_flow_to_net_income_Ratio_Ranking,asset_turnover_Ratio_Ranking
     
 
@@ -473,21 +641,16 @@ def get_RankingTableEfficiency(efficiency):
 # Streamlit Functions
 
 def plot_multiple_columns_lines(df, columns_to_plot):
-    # Get unique values in the 'company' column
-    companies = df['Company'].unique()
-
-    # Create a new DataFrame for Plotly Express
-    plotly_df = pd.DataFrame()
-
-    # Add columns for Plotly Express DataFrame
-    for company in companies:
-        for column in columns_to_plot:
-            company_df = df[(df['Company'] == company) & (df[column])]
-            plotly_df = pd.concat([plotly_df, pd.DataFrame({
-                'Date': company_df.index,
-                'Company - Column': [f"{company} - {column}"] * len(company_df),
-                'Value': company_df[column].tolist()
-            })])
+    # Reshape to one row per (date, company, column) in a single melt for Plotly Express
+    plotly_df = (df.rename_axis('Date').reset_index()
+                   .melt(id_vars=['Date', 'Company'], value_vars=columns_to_plot,
+                         var_name='Column', value_name='Value')
+                   .dropna(subset=['Value']))
+    if plotly_df.empty:
+        # identical empty figures would also collide on Streamlit's auto-generated element ID
+        st.info('No data to plot for the selected companies.')
+        return
+    plotly_df['Company - Column'] = plotly_df['Company'].astype(str) + ' - ' + plotly_df['Column']
 
     # Create an interactive line chart using Plotly Express
     fig = px.line(plotly_df, x='Date', y='Value', color='Company - Column', labels={'Value': 'Price'}, markers=True,  # Add markers to the lines
@@ -509,10 +672,31 @@ def plot_multiple_columns_lines(df, columns_to_plot):
 
 
 
-@st.cache_data
+@st.fragment
+def _render_ratio_plot(ratios, default):
+    # a fragment, so changing the plotted ratios reruns only this picker and chart
+    ratio_list=ratios.columns.drop('Company', errors='ignore').tolist()
+    selected_columns = st.multiselect('Please select which Ratios you wish to plot:',ratio_list, default=default)
+    # Plot line chart
+    if selected_columns:
+        plot_multiple_columns_lines(ratios,selected_columns)
+
+
+@st.cache_data(ttl=_CACHE_TTL, show_spinner=False)
 def convert_df(df):
     # IMPORTANT: Cache the conversion to prevent computation on every rerun
-    return df.to_csv().encode('utf-8')
+    # Arrow's C++ CSV writer is much faster than DataFrame.to_csv; keep the (unnamed) index as the first column like to_csv does
+    table = pa.Table.from_pandas(df.rename_axis(df.index.name or '').reset_index(), preserve_index=False)
+    # statement dates are day-precision, so write them as dates rather than full timestamps
+    table = table.cast(pa.schema([
+        pa.field(field.name, pa.date32()) if pa.types.is_timestamp(field.type) else field
+        for field in table.schema
+    ]))
+    buf = pa.BufferOutputStream()
+    # Not byte-identical to to_csv: Arrow's 'needed' style still quotes the header and every string
+    # field, integral floats drop the trailing '.0', and float32 columns keep float32 precision.
+    pacsv.write_csv(table, buf, pacsv.WriteOptions(quoting_style='needed'))
+    return buf.getvalue().to_pybytes()
 
 
 
@@ -520,12 +704,12 @@ def convert_df(df):
 def generate_tabs(selected_ticker_symbols):
 
     balance_sheet_tab, financials_tab, cash_flow_tab = st.tabs(["Balance Sheet", "Financials", "Cash Flow"])
+    Balance_Sheet, financial_statement, cash_flow_statement = get_AllStatements(selected_ticker_symbols)
 
     with balance_sheet_tab:
     
         # Balance Sheet Subsection
         st.subheader("Balance Sheet Information")
-        Balance_Sheet=get_MultipleBalanceSheet(selected_ticker_symbols)
         # generate graph of basic information in a balance sheet
         selected_columns = st.multiselect('Please select which Attributes of the Balance Sheet you wish to plot:', Balance_Sheet.columns.tolist(), default=['Total Assets','Total Liabilities Net Minority Interest'])
         # Plot line chart
@@ -544,7 +728,6 @@ def generate_tabs(selected_ticker_symbols):
     with financials_tab:
         # Balance Sheet Subsection
         st.subheader("Financial Statement Information")
-        financial_statement=get_MultipleFinancial(selected_ticker_symbols)
         # generate graph of basic information in a balance sheet
         selected_columns_financial = st.multiselect('Please select which Attributes of the Financial Statement you wish to plot:', financial_statement.columns.tolist(), default=['Net Income','Cost Of Revenue'])
         # Plot line chart
@@ -563,7 +746,6 @@ def generate_tabs(selected_ticker_symbols):
     with cash_flow_tab:
             # Balance Sheet Subsection
         st.subheader("Cash Flow Statement Information")
-        cash_flow_statement=get_MultipleCashFlow(selected_ticker_symbols)
         # generate graph of basic information in a balance sheet
         selected_columns_cash_flow = st.multiselect('Please select which Attributes of the Cash Flow Statement you wish to plot:', cash_flow_statement.columns.tolist(), default=['Free Cash Flow','Operating Cash Flow'])
         # Plot line chart
@@ -584,22 +766,16 @@ def generate_tabs(selected_ticker_symbols):
 
 def generate_ratio_tabs(selected_ticker_symbols):
     st.header("Important Ratio Information")
+    # a sorted tuple keys the cached ratio builders identically whatever order the tickers were picked in
+    selected_ticker_symbols=tuple(sorted(selected_ticker_symbols))
     Profitability_Ratios,Liquidity_Ratios ,Efficiency_Ratios,Whole_Ratio = st.tabs(["Profitability Ratios","Liquidity Ratios" ,"Efficiency Ratios","Complete Ratio Sheet"])
 
     with Profitability_Ratios:
         st.subheader("Profitability Ratio Information")
-        profitability_Ratios=get_MultipleProfitabilityRatios(selected_ticker_symbols)
-        profitability_list=profitability_Ratios.columns.tolist()
-        if 'Company' in profitability_list:
-            profitability_list.remove('Company')
-
-        selected_columns_profitability = st.multiselect('Please select which Ratios you wish to plot:',profitability_list, default=['Operating Profit Margin','Gross Profit Margin'])
-        # Plot line chart
-        if selected_columns_profitability:
-            plot_multiple_columns_lines(profitability_Ratios,selected_columns_profitability)
+        profitability_Ratios,gross_proffitmean_yoy_change_by_company,operating_proffitmean_yoy_change_by_company=get_MultipleProfitabilityRatios(selected_ticker_symbols)
+        _render_ratio_plot(profitability_Ratios, ['Operating Profit Margin','Gross Profit Margin'])
 
 
-        gross_proffitmean_yoy_change_by_company,operating_proffitmean_yoy_change_by_company=get_RankingTableProfitability(profitability_Ratios)
         gross_tab,operating_tab = st.tabs(["Gross Profit Margin Ranking", "Operating Profit Margin Ranking"])
         with gross_tab:
             st.header("Gross Profit Margin Ranking")
@@ -626,18 +802,9 @@ def generate_ratio_tabs(selected_ticker_symbols):
         )
     with Liquidity_Ratios:
         st.subheader("Liquidity Ratio Information")
-        liquidity_Ratios=get_MultipleLiquidityRatios(selected_ticker_symbols)
-        liquidity_list=liquidity_Ratios.columns.tolist()
-        if 'Company' in liquidity_list:
-            liquidity_list.remove('Company')
-
-        selected_columns_liquidity = st.multiselect('Please select which Ratios you wish to plot:',liquidity_list, default=['Current Ratio','Operating Cash Flow Ratio'])
-        # Plot line chart
-        if selected_columns_liquidity:
-            plot_multiple_columns_lines(liquidity_Ratios,selected_columns_liquidity)
-
+        liquidity_Ratios,current_ratio_Ranking,operating_cash_flow_ratio_Ranking=get_MultipleLiquidityRatios(selected_ticker_symbols)
+        _render_ratio_plot(liquidity_Ratios, ['Current Ratio','Operating Cash Flow Ratio'])
 
-        current_ratio_Ranking,operating_cash_flow_ratio_Ranking=get_RankingTableLiquidity(liquidity_Ratios)
 
         current_ratio_tab,operating_cash_flow_ratio_tab = st.tabs(["Current Ratio Ranking", "Operating Cash Flow Ratio Ranking"])
         with current_ratio_tab:
@@ -667,19 +834,9 @@ def generate_ratio_tabs(selected_ticker_symbols):
 
     with Efficiency_Ratios:
         st.subheader("Efficiency Ratio Information")
-        efficiency_Ratios=get_MultipleEfficiencyRatios(selected_ticker_symbols)
-        efficiency_list=efficiency_Ratios.columns.tolist()
+        efficiency_Ratios,cash_flow_to_net_income_Ratio_Ranking,cash_flow_to_net_income_Ratio_RankingYoY=get_MultipleEfficiencyRatios(selected_ticker_symbols)
+        _render_ratio_plot(efficiency_Ratios, ['Cash Flow to Income Ratio'])
 
-        if 'Company' in efficiency_list:
-            efficiency_list.remove('Company')
-
-        selected_columns_efficiency = st.multiselect('Please select which Ratios you wish to plot:',efficiency_list, default=['Cash Flow to Income Ratio'])
-        # Plot line chart
-        if selected_columns_efficiency:
-            plot_multiple_columns_lines(efficiency_Ratios,selected_columns_efficiency)
-
-
-        cash_flow_to_net_income_Ratio_Ranking,cash_flow_to_net_income_Ratio_RankingYoY=get_RankingTableEfficiency(efficiency_Ratios)
 
         cash_flow_to_net_income_ratio_tab,cash_flow_to_net_income_ratio_YOY_tab = st.tabs(["Cash Flow to Income Ratio Ranking","Cash Flow to Income Ratio Ranking Most Improved"])
         with cash_flow_to_net_income_ratio_tab:
@@ -710,13 +867,7 @@ def generate_ratio_tabs(selected_ticker_symbols):
         st.subheader("Complete Ratio Sheet Information")
         Ratio_df=get_WholeRatio(selected_ticker_symbols)
 
-        ratio_list=Ratio_df.columns.tolist()
-        if 'Company' in ratio_list:
-            ratio_list.remove('Company')
-        selected_columns_ratio = st.multiselect('Please select which Ratios you wish to plot:',ratio_list, default=['Current Ratio','Equity_Multiplier_Ratio'])
-        # Plot line chart
-        if selected_columns_ratio:
-            plot_multiple_columns_lines(Ratio_df,selected_columns_ratio)
+        _render_ratio_plot(Ratio_df, ['Current Ratio','Equity_Multiplier_Ratio'])
 
         ratio_df_csv = convert_df(Ratio_df)
 
@@ -1,12 +1,173 @@
 
+from dataclasses import dataclass
+
+import numpy as np
 import pandas as pd
+import streamlit as st
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; without it the kernels run as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# snapshot label -> statement line item, in snapshot order
+_BS_FIELDS = {
+    "Current Assets": "Current Assets",
+    "Current Liabilities": "Current Liabilities",
+    "Total Assets": "Total Assets",
+    "Total Liabilities": "Total Liabilities Net Minority Interest",
+    "Total Equity": "Total Equity Gross Minority Interest",
+    "Cash & Equivalents": "Cash And Cash Equivalents",
+}
+_FS_FIELDS = {
+    "Revenue": "Total Revenue",
+    "EBIT": "EBIT",
+    "Gross Profit": "Gross Profit",
+    "Net Income": "Net Income",
+}
+_CF_FIELDS = {
+    "Operating Cash Flow": "Operating Cash Flow",
+    "Free Cash Flow": "Free Cash Flow",
+    "Capex": "Capital Expenditure",
+}
+
+def _latest_values(row: pd.Series, fields: dict) -> dict:
+    # one reindex for all line items; None (not NaN) marks an item the statement lacks
+    items = pd.Index(fields.values())
+    values = row.reindex(items).to_numpy()
+    present = items.isin(row.index)
+    return {label: (value if ok else None) for label, value, ok in zip(fields, values, present)}
+
+# Scoring ladders: (ascending thresholds, score per bucket, searchsorted side, flag per score).
+# side="right" reproduces `value >= threshold` ladders, side="left" reproduces `value <= threshold` ones.
+_LIQUIDITY_LADDER = (np.array([0.8, 1.0, 1.5]), np.array([1, 4, 7, 10]), "right", {
+    4: "Current Ratio is below 1.0 (tight short-term liquidity).",
+    1: "Current Ratio is very low (high short-term liquidity risk).",
+})
+_LEVERAGE_LADDER = (np.array([1.0, 2.0, 3.0]), np.array([10, 7, 4, 1]), "left", {
+    4: "High leverage (liabilities materially exceed equity).",
+    1: "Very high leverage (risk increases sharply in downturns).",
+})
+_SOLVENCY_LADDER = (np.array([0.5, 0.7, 0.85]), np.array([10, 7, 4, 1]), "left", {
+    4: "Liabilities are a large share of assets (solvency weaker).",
+    1: "Liabilities dominate the asset base (solvency risk).",
+})
+_OP_MARGIN_LADDER = (np.array([0.06, 0.12, 0.20]), np.array([1, 4, 7, 10]), "right", {
+    4: "Thin operating margin (profits can vanish in a slowdown).",
+    1: "Very low operating margin (business model looks fragile).",
+})
+_GROSS_MARGIN_LADDER = (np.array([0.15, 0.25, 0.40]), np.array([1, 4, 7, 10]), "right", {
+    4: "Low gross margin (limited pricing power or high input costs).",
+    1: "Very low gross margin (watch competitive pressure).",
+})
+_CASH_CONVERSION_LADDER = (np.array([0.6, 0.9, 1.2]), np.array([1, 4, 7, 10]), "right", {
+    4: "Cash conversion is weak (profits not turning into cash).",
+    1: "Very weak cash conversion (potential accrual risk).",
+})
+
+# (metric name, snapshot label, numerator label, denominator label, ladder, flag when it cannot be computed)
+_RATIO_METRICS = (
+    ("Liquidity (Current Ratio)", "Current Ratio", "Current Assets", "Current Liabilities",
+     _LIQUIDITY_LADDER, "Could not compute Current Ratio (missing current assets/liabilities)."),
+    # total liabilities stand in for debt
+    ("Leverage (Debt/Equity proxy)", "Debt to Equity (Liab/Equity)", "Total Liabilities", "Total Equity",
+     _LEVERAGE_LADDER, "Could not compute leverage ratio (missing liabilities/equity)."),
+    ("Solvency (Liab/Assets)", "Debt to Assets (Liab/Assets)", "Total Liabilities", "Total Assets",
+     _SOLVENCY_LADDER, None),
+    ("Profitability (Operating Margin)", "Operating Margin (EBIT/Revenue)", "EBIT", "Revenue",
+     _OP_MARGIN_LADDER, "Could not compute operating margin (missing EBIT/revenue)."),
+    ("Unit Economics (Gross Margin)", "Gross Margin (Gross Profit/Revenue)", "Gross Profit", "Revenue",
+     _GROSS_MARGIN_LADDER, None),
+    ("Earnings Quality (OCF/Net Income)", "OCF / Net Income", "Operating Cash Flow", "Net Income",
+     _CASH_CONVERSION_LADDER, "Could not compute OCF/Net Income (missing OCF or Net Income)."),
+)
+
+# FCF buckets: at or below -5% of |revenue| (-0.05 without a usable revenue), up to 0, above 0
+_FCF_SCORES = np.array([2, 6, 10])
+_FCF_FLAGS = {
+    0: "Free Cash Flow missing from Yahoo Finance for this ticker.",
+    6: "FCF slightly negative (may be investment-heavy period).",
+    2: "FCF materially negative (funding needs can rise).",
+}
+
+# 3-year trend inputs: (statement, line item); the checks below run in this order
+_TREND_ITEMS = {
+    "liab": ("bs", "Total Liabilities Net Minority Interest"),
+    "rev": ("fs", "Total Revenue"),
+    "ni": ("fs", "Net Income"),
+    "rec": ("bs", "Accounts Receivable"),
+    "inv": ("bs", "Inventory"),
+}
+_TREND_PENALTIES = np.array([3, 3, 3, 2, 2])
+_TREND_FLAGS = (
+    "Liabilities grew >50% over last ~3 reported years (leverage trending up).",
+    "Revenue trend is negative over last ~3 reported years.",
+    "Net income trend is negative over last ~3 reported years.",
+    "Receivables rising much faster than revenue (collection risk).",
+    "Inventory rising much faster than revenue (demand/stock risk).",
+)
+
+def _bucket_score(value, ladder) -> int:
+    thresholds, scores, side, _ = ladder
+    # NaN fails every comparison, so it lands in the worst bucket
+    if pd.isna(value):
+        return int(scores.min())
+    return int(scores[np.searchsorted(thresholds, value, side=side)])
+
+def _bucket_scores(values: np.ndarray, ladder) -> np.ndarray:
+    thresholds, scores, side, _ = ladder
+    return np.where(np.isnan(values), scores.min(), scores[np.searchsorted(thresholds, values, side=side)])
+
+def _rating(score: int) -> str:
+    if score >= 80:
+        return "Strong"
+    if score >= 60:
+        return "Okay"
+    if score >= 40:
+        return "Weak"
+    return "Risky"
+
+@dataclass(frozen=True, slots=True)
+class HealthResult:
+    score: int  # 0-100
+    rating: str  # Strong / Okay / Weak / Risky, or No Data
+    metric_scores: dict  # per-metric numeric scores (0-10)
+    flags: tuple  # human-readable warnings, most important metric first
+    snapshot: dict  # latest-year values for key fields and ratios
+
+def _no_data_result() -> HealthResult:
+    return HealthResult(0, "No Data", {}, ("Missing statements from Yahoo Finance for this ticker.",), {})
+
+def _result(metric_scores: dict, flags: list, snapshot: dict) -> HealthResult:
+    total = sum(metric_scores.values())
+    score = round((total / (10 * len(metric_scores))) * 100) if metric_scores else 0
+    return HealthResult(score, _rating(score), metric_scores, tuple(flags), snapshot)
 
 def _last_n_years(df: pd.DataFrame, n: int = 3) -> pd.DataFrame:
     if df is None or df.empty:
         return df
-    df = df.sort_index()
-    # yfinance indexes are often Timestamp year-end dates
-    return df.iloc[-n:]
+    # callers pass frames already sorted by date (yfinance year-end Timestamps)
+    return df.tail(n)
+
+@njit(cache=True)
+def _trend_pct_kernel(values):
+    # change from the first to the last non-NaN value, relative to the first; NaN when undefined
+    first_i = -1
+    last_i = -1
+    for i in range(values.shape[0]):
+        if not np.isnan(values[i]):
+            if first_i < 0:
+                first_i = i
+            last_i = i
+    if first_i < 0 or first_i == last_i or values[first_i] == 0:
+        return np.nan
+    return (values[last_i] - values[first_i]) / abs(values[first_i])
+
+def _trend_pct(series):
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    trend = _trend_pct_kernel(values)
+    return None if np.isnan(trend) else trend
 
 def _safe_div(a, b):
     try:
@@ -16,24 +177,31 @@ def _safe_div(a, b):
     except Exception:
         return None
 
+def _safe_div_vec(num, den) -> np.ndarray:
+    # array form of _safe_div for batched scoring: NaN where the denominator is 0
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    return np.divide(num, den, out=np.full_like(num, np.nan), where=den != 0)
+
+# scoring is pure in its inputs, so reruns with the same statements reuse the previous result
+@st.cache_data(ttl=60 * 60, show_spinner=False)
 def score_company_health(
     ticker: str,
     balance_sheet: pd.DataFrame,
     financials: pd.DataFrame,
     cashflow: pd.DataFrame,
-) -> dict:
+) -> HealthResult:
     """
-    Returns a dict with:
+    Returns a HealthResult with:
       - score (0-100)
       - rating (Strong / Okay / Weak / Risky)
       - metric_scores: per-metric numeric scores
-      - flags: list[str]
+      - flags: tuple[str]
       - snapshot: latest-year values for key fields
     Assumes inputs are transposed (index=time, columns=line items) as produced by the project functions.
     """
     flags = []
     metric_scores = {}
-    snapshot = {}
 
     # --- Pick latest year row ---
     bs = balance_sheet.sort_index() if balance_sheet is not None else pd.DataFrame()
@@ -41,224 +209,184 @@ def score_company_health(
     cf = cashflow.sort_index() if cashflow is not None else pd.DataFrame()
 
     if bs.empty or fs.empty or cf.empty:
-        return {
-            "score": 0,
-            "rating": "No Data",
-            "metric_scores": {},
-            "flags": ["Missing statements from Yahoo Finance for this ticker."],
-            "snapshot": {}
-        }
+        return _no_data_result()
 
     latest_bs = bs.iloc[-1]
     latest_fs = fs.iloc[-1]
     latest_cf = cf.iloc[-1]
 
     # --- Core values (best-effort) ---
-    cur_assets = latest_bs.get("Current Assets")
-    cur_liab = latest_bs.get("Current Liabilities")
-    tot_assets = latest_bs.get("Total Assets")
-    tot_liab = latest_bs.get("Total Liabilities Net Minority Interest")
-    equity = latest_bs.get("Total Equity Gross Minority Interest")
-    cash = latest_bs.get("Cash And Cash Equivalents")
-
-    revenue = latest_fs.get("Total Revenue")
-    ebit = latest_fs.get("EBIT")  # yfinance provides EBIT
-    gross_profit = latest_fs.get("Gross Profit")
-    net_income = latest_fs.get("Net Income")
-
-    ocf = latest_cf.get("Operating Cash Flow")
-    fcf = latest_cf.get("Free Cash Flow")
-    capex = latest_cf.get("Capital Expenditure")
-
-    # Store snapshot
-    snapshot.update({
-        "Current Assets": cur_assets,
-        "Current Liabilities": cur_liab,
-        "Total Assets": tot_assets,
-        "Total Liabilities": tot_liab,
-        "Total Equity": equity,
-        "Cash & Equivalents": cash,
-        "Revenue": revenue,
-        "EBIT": ebit,
-        "Gross Profit": gross_profit,
-        "Net Income": net_income,
-        "Operating Cash Flow": ocf,
-        "Free Cash Flow": fcf,
-        "Capex": capex,
-    })
+    snapshot = {
+        **_latest_values(latest_bs, _BS_FIELDS),
+        **_latest_values(latest_fs, _FS_FIELDS),
+        **_latest_values(latest_cf, _CF_FIELDS),
+    }
+    revenue = snapshot["Revenue"]
+    fcf = snapshot["Free Cash Flow"]
 
     # --- Helper: last 3-year trends (working-capital stress, leverage trend, cash conversion trend) ---
     bs3 = _last_n_years(bs, 3)
     fs3 = _last_n_years(fs, 3)
     cf3 = _last_n_years(cf, 3)
 
-    def _trend_pct(series):
-        s = pd.to_numeric(series, errors="coerce").dropna()
-        if len(s) < 2:
-            return None
-        first, last = s.iloc[0], s.iloc[-1]
-        if first == 0 or pd.isna(first) or pd.isna(last):
-            return None
-        return (last - first) / abs(first)
-
     # --- Metrics & scoring (0..10 each, total scaled to 100) ---
-    # 1) Liquidity: current ratio
-    current_ratio = _safe_div(cur_assets, cur_liab)
-    snapshot["Current Ratio"] = current_ratio
-    if current_ratio is None:
-        metric_scores["Liquidity (Current Ratio)"] = 0
-        flags.append("Could not compute Current Ratio (missing current assets/liabilities).")
-    elif current_ratio >= 1.5:
-        metric_scores["Liquidity (Current Ratio)"] = 10
-    elif current_ratio >= 1.0:
-        metric_scores["Liquidity (Current Ratio)"] = 7
-    elif current_ratio >= 0.8:
-        metric_scores["Liquidity (Current Ratio)"] = 4
-        flags.append("Current Ratio is below 1.0 (tight short-term liquidity).")
-    else:
-        metric_scores["Liquidity (Current Ratio)"] = 1
-        flags.append("Current Ratio is very low (high short-term liquidity risk).")
-
-    # 2) Leverage: debt-to-equity (using total liabilities as proxy)
-    debt_to_equity = _safe_div(tot_liab, equity)
-    snapshot["Debt to Equity (Liab/Equity)"] = debt_to_equity
-    if debt_to_equity is None:
-        metric_scores["Leverage (Debt/Equity proxy)"] = 0
-        flags.append("Could not compute leverage ratio (missing liabilities/equity).")
-    elif debt_to_equity <= 1.0:
-        metric_scores["Leverage (Debt/Equity proxy)"] = 10
-    elif debt_to_equity <= 2.0:
-        metric_scores["Leverage (Debt/Equity proxy)"] = 7
-    elif debt_to_equity <= 3.0:
-        metric_scores["Leverage (Debt/Equity proxy)"] = 4
-        flags.append("High leverage (liabilities materially exceed equity).")
-    else:
-        metric_scores["Leverage (Debt/Equity proxy)"] = 1
-        flags.append("Very high leverage (risk increases sharply in downturns).")
-
-    # 3) Solvency: debt-to-assets (liabilities/assets)
-    debt_to_assets = _safe_div(tot_liab, tot_assets)
-    snapshot["Debt to Assets (Liab/Assets)"] = debt_to_assets
-    if debt_to_assets is None:
-        metric_scores["Solvency (Liab/Assets)"] = 0
-    elif debt_to_assets <= 0.5:
-        metric_scores["Solvency (Liab/Assets)"] = 10
-    elif debt_to_assets <= 0.7:
-        metric_scores["Solvency (Liab/Assets)"] = 7
-    elif debt_to_assets <= 0.85:
-        metric_scores["Solvency (Liab/Assets)"] = 4
-        flags.append("Liabilities are a large share of assets (solvency weaker).")
-    else:
-        metric_scores["Solvency (Liab/Assets)"] = 1
-        flags.append("Liabilities dominate the asset base (solvency risk).")
-
-    # 4) Profitability: operating margin (EBIT / Revenue)
-    op_margin = _safe_div(ebit, revenue)
-    snapshot["Operating Margin (EBIT/Revenue)"] = op_margin
-    if op_margin is None:
-        metric_scores["Profitability (Operating Margin)"] = 0
-        flags.append("Could not compute operating margin (missing EBIT/revenue).")
-    elif op_margin >= 0.20:
-        metric_scores["Profitability (Operating Margin)"] = 10
-    elif op_margin >= 0.12:
-        metric_scores["Profitability (Operating Margin)"] = 7
-    elif op_margin >= 0.06:
-        metric_scores["Profitability (Operating Margin)"] = 4
-        flags.append("Thin operating margin (profits can vanish in a slowdown).")
-    else:
-        metric_scores["Profitability (Operating Margin)"] = 1
-        flags.append("Very low operating margin (business model looks fragile).")
-
-    # 5) Unit economics: gross margin (Gross Profit / Revenue)
-    gross_margin = _safe_div(gross_profit, revenue)
-    snapshot["Gross Margin (Gross Profit/Revenue)"] = gross_margin
-    if gross_margin is None:
-        metric_scores["Unit Economics (Gross Margin)"] = 0
-    elif gross_margin >= 0.40:
-        metric_scores["Unit Economics (Gross Margin)"] = 10
-    elif gross_margin >= 0.25:
-        metric_scores["Unit Economics (Gross Margin)"] = 7
-    elif gross_margin >= 0.15:
-        metric_scores["Unit Economics (Gross Margin)"] = 4
-        flags.append("Low gross margin (limited pricing power or high input costs).")
-    else:
-        metric_scores["Unit Economics (Gross Margin)"] = 1
-        flags.append("Very low gross margin (watch competitive pressure).")
-
-    # 6) Earnings quality: OCF vs Net Income
-    cash_to_income = _safe_div(ocf, net_income)
-    snapshot["OCF / Net Income"] = cash_to_income
-    if cash_to_income is None:
-        metric_scores["Earnings Quality (OCF/Net Income)"] = 0
-        flags.append("Could not compute OCF/Net Income (missing OCF or Net Income).")
-    elif cash_to_income >= 1.2:
-        metric_scores["Earnings Quality (OCF/Net Income)"] = 10
-    elif cash_to_income >= 0.9:
-        metric_scores["Earnings Quality (OCF/Net Income)"] = 7
-    elif cash_to_income >= 0.6:
-        metric_scores["Earnings Quality (OCF/Net Income)"] = 4
-        flags.append("Cash conversion is weak (profits not turning into cash).")
-    else:
-        metric_scores["Earnings Quality (OCF/Net Income)"] = 1
-        flags.append("Very weak cash conversion (potential accrual risk).")
+    # 1) Liquidity 2) Leverage 3) Solvency 4) Profitability 5) Unit economics 6) Earnings quality
+    for name, label, numerator, denominator, ladder, missing_flag in _RATIO_METRICS:
+        value = _safe_div(snapshot[numerator], snapshot[denominator])
+        snapshot[label] = value
+        if value is None:
+            metric_scores[name] = 0
+            if missing_flag:
+                flags.append(missing_flag)
+            continue
+        metric_scores[name] = _bucket_score(value, ladder)
+        flag = ladder[3].get(metric_scores[name])
+        if flag:
+            flags.append(flag)
 
-    # 7) Free cash flow health: FCF positive + capex intensity proxy
-    if pd.isna(fcf):
+    # 7) Free cash flow health: positive, within 5% of revenue below zero, or materially negative
+    fcf = np.nan if fcf is None else float(fcf)
+    rev = np.nan if revenue is None else float(revenue)
+    if np.isnan(fcf):
         metric_scores["Free Cash Flow (FCF)"] = 0
-        flags.append("Free Cash Flow missing from Yahoo Finance for this ticker.")
     else:
-        if fcf > 0:
-            metric_scores["Free Cash Flow (FCF)"] = 10
-        elif fcf > -0.05 * (revenue if revenue else 1):
-            metric_scores["Free Cash Flow (FCF)"] = 6
-            flags.append("FCF slightly negative (may be investment-heavy period).")
-        else:
-            metric_scores["Free Cash Flow (FCF)"] = 2
-            flags.append("FCF materially negative (funding needs can rise).")
+        floor = -0.05 * (abs(rev) if np.isfinite(rev) else 1.0)
+        metric_scores["Free Cash Flow (FCF)"] = int(_FCF_SCORES[np.searchsorted([floor, 0.0], fcf, side="left")])
+    if metric_scores["Free Cash Flow (FCF)"] in _FCF_FLAGS:
+        flags.append(_FCF_FLAGS[metric_scores["Free Cash Flow (FCF)"]])
 
     # 8) Trend sanity checks (3-year)
-    liab_trend = _trend_pct(bs3.get("Total Liabilities Net Minority Interest"))
-    rev_trend = _trend_pct(fs3.get("Total Revenue"))
-    ni_trend = _trend_pct(fs3.get("Net Income"))
-    rec_trend = _trend_pct(bs3.get("Accounts Receivable"))
-    inv_trend = _trend_pct(bs3.get("Inventory"))
-
-    trend_points = 10
-    if liab_trend is not None and liab_trend > 0.5:
-        trend_points -= 3
-        flags.append("Liabilities grew >50% over last ~3 reported years (leverage trending up).")
-    if rev_trend is not None and rev_trend < 0:
-        trend_points -= 3
-        flags.append("Revenue trend is negative over last ~3 reported years.")
-    if ni_trend is not None and ni_trend < 0:
-        trend_points -= 3
-        flags.append("Net income trend is negative over last ~3 reported years.")
-    if rec_trend is not None and rev_trend is not None and rec_trend > rev_trend + 0.25:
-        trend_points -= 2
-        flags.append("Receivables rising much faster than revenue (collection risk).")
-    if inv_trend is not None and rev_trend is not None and inv_trend > rev_trend + 0.25:
-        trend_points -= 2
-        flags.append("Inventory rising much faster than revenue (demand/stock risk).")
+    recent = {"bs": bs3, "fs": fs3}
+    trends = {key: _trend_pct(recent[statement].get(item)) for key, (statement, item) in _TREND_ITEMS.items()}
+    liab_trend, rev_trend, ni_trend, rec_trend, inv_trend = trends.values()
+    checks = np.array([
+        liab_trend is not None and liab_trend > 0.5,
+        rev_trend is not None and rev_trend < 0,
+        ni_trend is not None and ni_trend < 0,
+        rec_trend is not None and rev_trend is not None and rec_trend > rev_trend + 0.25,
+        inv_trend is not None and rev_trend is not None and inv_trend > rev_trend + 0.25,
+    ], dtype=bool)
+
+    trend_points = 10 - int(_TREND_PENALTIES[checks].sum())
+    flags.extend(flag for failed, flag in zip(checks, _TREND_FLAGS) if failed)
 
     metric_scores["Trend Checks (3y)"] = max(trend_points, 0)
 
     # --- Total score ---
-    total = sum(metric_scores.values())
-    score = round((total / (10 * len(metric_scores))) * 100) if metric_scores else 0
+    return _result(metric_scores, flags, snapshot)
 
-    if score >= 80:
-        rating = "Strong"
-    elif score >= 60:
-        rating = "Okay"
-    elif score >= 40:
-        rating = "Weak"
-    else:
-        rating = "Risky"
-
-    return {
-        "score": score,
-        "rating": rating,
-        "metric_scores": metric_scores,
-        "flags": flags,
-        "snapshot": snapshot
+def _by_company(panel: pd.DataFrame, tickers: list, n: int) -> pd.DataFrame:
+    # last n dated rows of each company, keeping only the requested tickers
+    if panel is None or panel.empty or "Company" not in panel:
+        return pd.DataFrame(columns=["Company"])
+    panel = panel.sort_index()
+    companies = panel["Company"].astype(object)
+    panel = panel[companies.isin(tickers)].assign(Company=companies)
+    return panel.groupby("Company", sort=False).tail(n)
+
+def _score_panels(tickers: list, bs_panel: pd.DataFrame, fs_panel: pd.DataFrame, cf_panel: pd.DataFrame):
+    # column-wise scoring for score_companies_health; frames are indexed by the tickers that have
+    # all three statements, and None is returned when no ticker does
+    recent = {
+        "bs": _by_company(bs_panel, tickers, 3),
+        "fs": _by_company(fs_panel, tickers, 3),
+        "cf": _by_company(cf_panel, tickers, 3),
     }
+    present = [set(df["Company"]) for df in recent.values()]
+    scored = [t for t in tickers if all(t in companies for companies in present)]
+    if not scored:
+        return None
+
+    # --- Latest values: one row per ticker, None-equivalent columns tracked in `absent` ---
+    values = pd.DataFrame(index=scored)
+    absent = set()
+    for key, fields in (("bs", _BS_FIELDS), ("fs", _FS_FIELDS), ("cf", _CF_FIELDS)):
+        latest = recent[key].groupby("Company", sort=False).tail(1).set_index("Company").reindex(scored)
+        for label, item in fields.items():
+            if item in latest:
+                values[label] = pd.to_numeric(latest[item], errors="coerce")
+            else:
+                values[label] = np.nan
+                absent.add(label)
+
+    # --- Ratio metrics ---
+    scores = pd.DataFrame(index=scored)
+    undefined = {}
+    for name, label, numerator, denominator, ladder, _ in _RATIO_METRICS:
+        num, den = values[numerator], values[denominator]
+        values[label] = _safe_div_vec(num, den)
+        undefined[label] = (den == 0) | (numerator in absent) | (denominator in absent)
+        bucketed = _bucket_scores(values[label].to_numpy(dtype=float), ladder)
+        scores[name] = np.where(undefined[label], 0, bucketed)
+
+    # --- Free cash flow, same buckets as the scalar scorer ---
+    fcf = values["Free Cash Flow"]
+    revenue = values["Revenue"]
+    floor = -0.05 * revenue.abs().where(np.isfinite(revenue), 1.0)
+    scores["Free Cash Flow (FCF)"] = np.select([fcf.isna(), fcf > 0, fcf > floor], [0, 10, 6], 2)
+
+    # --- 3-year trends: first/last non-null of each ticker's last three rows ---
+    trends = pd.DataFrame(index=scored)
+    for key, (statement, item) in _TREND_ITEMS.items():
+        frame = recent[statement]
+        if item not in frame:
+            trends[key] = np.nan
+            continue
+        grouped = pd.to_numeric(frame[item], errors="coerce").groupby(frame["Company"], sort=False)
+        first, last, count = grouped.first(), grouped.last(), grouped.count()
+        trend = ((last - first) / first.abs()).where((count >= 2) & (first != 0))
+        trends[key] = trend.reindex(scored)
+    checks = pd.DataFrame({
+        0: trends["liab"] > 0.5,
+        1: trends["rev"] < 0,
+        2: trends["ni"] < 0,
+        3: trends["rec"] > trends["rev"] + 0.25,
+        4: trends["inv"] > trends["rev"] + 0.25,
+    })
+    penalty = checks.to_numpy() @ _TREND_PENALTIES
+    scores["Trend Checks (3y)"] = np.maximum(10 - penalty, 0)
+    return values, absent, undefined, scores, checks
+
+def score_companies_health(
+    tickers: list,
+    bs_panel: pd.DataFrame,
+    fs_panel: pd.DataFrame,
+    cf_panel: pd.DataFrame,
+) -> dict:
+    """
+    Scores every ticker at once from long-format statements (index=time, a 'Company' column naming
+    the ticker, as returned by get_MultipleBalanceSheet / get_MultipleFinancial / get_MultipleCashFlow).
+    Returns {ticker: HealthResult}, each identical to score_company_health on that ticker's rows.
+    A line item absent from a whole panel counts as missing for every ticker.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    scored = _score_panels(tickers, bs_panel, fs_panel, cf_panel)
+    if scored is None:
+        return {t: _no_data_result() for t in tickers}
+    values, absent, undefined, scores, checks = scored
+
+    # --- Assemble per-ticker results in the scalar scorer's key and flag order ---
+    results = {}
+    snapshot_labels = [*_BS_FIELDS, *_FS_FIELDS, *_CF_FIELDS]
+    for t in tickers:
+        if t not in scores.index:
+            results[t] = _no_data_result()
+            continue
+        row = values.loc[t]
+        snapshot = {label: (None if label in absent else row[label]) for label in snapshot_labels}
+        metric_scores = {name: int(score) for name, score in scores.loc[t].items()}
+        flags = []
+        for name, label, _, _, ladder, missing_flag in _RATIO_METRICS:
+            if undefined[label][t]:
+                snapshot[label] = None
+                if missing_flag:
+                    flags.append(missing_flag)
+            else:
+                snapshot[label] = row[label]
+                if metric_scores[name] in ladder[3]:
+                    flags.append(ladder[3][metric_scores[name]])
+        if metric_scores["Free Cash Flow (FCF)"] in _FCF_FLAGS:
+            flags.append(_FCF_FLAGS[metric_scores["Free Cash Flow (FCF)"]])
+        flags.extend(flag for failed, flag in zip(checks.loc[t], _TREND_FLAGS) if failed)
+        results[t] = _result(metric_scores, flags, snapshot)
+    return results
@@ -1,24 +1,23 @@
 
 import re
+from collections import namedtuple
+from functools import lru_cache
+
 import streamlit as st
 import pandas as pd
 
 from financialstatementfunctions_p import (
-    get_MultipleBalanceSheet,
+    get_AllStatements,
     get_WholeRatio,
     convert_df,
-    get_MultipleFinancial,
-    get_MultipleCashFlow,
     generate_tabs,
     get_MultipleProfitabilityRatios,
     get_MultipleLiquidityRatios,
     get_MultipleEfficiencyRatios,
-    extract_balance_sheet,
-    get_Financial,
-    get_CashFLow,
+    _cache_complete,
 )
 
-from health import score_company_health
+from health import score_companies_health
 
 # ----------------------------
 # Page config + styling
@@ -54,78 +53,69 @@ st.markdown(
 # Helpers
 # ----------------------------
 def _dedup_keep_order(seq):
-    seen = set()
-    out = []
-    for x in seq:
-        if x not in seen:
-            out.append(x)
-            seen.add(x)
-    return out
+    # dicts keep insertion order, so fromkeys drops repeats in one pass
+    return list(dict.fromkeys(seq))
+
+_TICKER_SPLIT = re.compile(r"[,\s]+")
 
 def _clean_ticker_list(text: str):
     if not text or not text.strip():
         return []
-    parts = re.split(r"[,\s]+", text.strip())
-    return [p.upper() for p in parts if p]
-
-def _fmt_num(x):
-    try:
-        if x is None or pd.isna(x):
-            return "—"
-        x = float(x)
-        ax = abs(x)
-        if ax >= 1e12:
-            return f"{x/1e12:,.2f}T"
-        if ax >= 1e9:
-            return f"{x/1e9:,.2f}B"
-        if ax >= 1e6:
-            return f"{x/1e6:,.2f}M"
-        if ax >= 1e3:
-            return f"{x:,.0f}"
-        return f"{x:,.2f}"
-    except Exception:
-        return str(x)
+    return [p.upper() for p in _TICKER_SPLIT.split(text.strip()) if p]
 
+@lru_cache(maxsize=16)
 def _rating_badge(rating: str):
     # Keep minimal, no hard-coded colors; rely on default theme.
     return f"<span class='fv-badge'>{rating}</span>"
 
-@st.cache_data(ttl=60 * 60, show_spinner=False)
-def _load_statements(tickers: tuple[str, ...]):
-    # These functions are from your existing module.
-    bs = get_MultipleBalanceSheet(list(tickers))
-    fs = get_MultipleFinancial(list(tickers))
-    cf = get_MultipleCashFlow(list(tickers))
-    return bs, fs, cf
-
-@st.cache_data(ttl=60 * 60, show_spinner=False)
-def _load_ratios(tickers: tuple[str, ...]):
-    prof = get_MultipleProfitabilityRatios(list(tickers))
-    liq = get_MultipleLiquidityRatios(list(tickers))
-    eff = get_MultipleEfficiencyRatios(list(tickers))
-    allr = get_WholeRatio(list(tickers))
-    return prof, liq, eff, allr
+_LoadedData = namedtuple("_LoadedData", ["bs", "fs", "cf", "prof", "liq", "eff", "allr", "ratio_cols"])
+
+_GLOBAL_PRESETS = {
+    "Apple": "AAPL",
+    "Microsoft": "MSFT",
+    "Nvidia": "NVDA",
+    "Google": "GOOG",
+    "Amazon": "AMZN",
+}
+# India presets share one list of names and base symbols; the exchange suffix is added per market.
+_INDIA_NAMES = ("Reliance", "TCS", "HDFC Bank", "Infosys", "ITC", "L&T", "SBI", "Airtel", "Asian Paints", "HUL")
+_INDIA_TICKERS = ("RELIANCE", "TCS", "HDFCBANK", "INFY", "ITC", "LT", "SBIN", "BHARTIARTL", "ASIANPAINT", "HINDUNILVR")
+
+@lru_cache(maxsize=4)
+def _india_presets(suffix: str) -> dict:
+    # Only depends on the exchange suffix, so build it once per market instead of on every rerun.
+    return dict(zip(_INDIA_NAMES, (t + suffix for t in _INDIA_TICKERS)))
+
+@_cache_complete
+def _load_all(tickers: tuple[str, ...]):
+    # One cached load for every tab: statements come from a single fetch pass, and the ratio
+    # builders read the same per-ticker cache entries instead of going back to Yahoo.
+    ticker_list = list(tickers)
+    bs, fs, cf = get_AllStatements(ticker_list)
+    prof, _, _ = get_MultipleProfitabilityRatios(ticker_list)
+    liq, _, _ = get_MultipleLiquidityRatios(ticker_list)
+    eff, _, _ = get_MultipleEfficiencyRatios(ticker_list)
+    allr = get_WholeRatio(ticker_list)
+    ratio_cols = allr.columns.drop("Company", errors="ignore").tolist()
+    return _LoadedData(bs, fs, cf, prof, liq, eff, allr, ratio_cols)
 
 def _latest_snapshot(df: pd.DataFrame, tickers: list[str], cols: list[str]) -> pd.DataFrame:
-    rows = []
-    for t in tickers:
-        d = df[df["Company"] == t].sort_index()
-        if d.empty:
-            continue
-        row = d.iloc[-1]
-        rows.append([t] + [row.get(c) for c in cols])
-    return pd.DataFrame(rows, columns=["Company"] + cols)
-
-def _build_health_for_ticker(ticker: str):
-    # Uses your single-ticker helpers to avoid shape issues.
-    current_Assets, non_current_Assets, total_Assets, current_Liabilities, non_current_Liabilities, total_Liabilities, equity = extract_balance_sheet(ticker)
-    bs_single = pd.concat(
-        [current_Assets, non_current_Assets, total_Assets, current_Liabilities, non_current_Liabilities, total_Liabilities, equity],
-        axis=1
-    )
-    fs_single = get_Financial(ticker)
-    cf_single = get_CashFLow(ticker)
-    return score_company_health(ticker, bs_single, fs_single, cf_single)
+    cols = [c for c in cols if c in df.columns]
+    if not cols:
+        # nothing to pick from the rows, so skip the sort and groupby and just list the companies
+        companies = set(df["Company"].astype(str))
+        return pd.DataFrame({"Company": [t for t in tickers if t in companies]})
+    # One groupby picks every company's latest row; tail(1) keeps NaNs in that row like iloc[-1] did.
+    latest = df.sort_index().groupby("Company", sort=False, observed=True).tail(1)
+    latest = latest.set_index(latest["Company"].astype(str))[cols]
+    return latest.reindex([t for t in tickers if t in latest.index]).rename_axis("Company").reset_index()
+
+@_cache_complete
+def _score_all(tickers: tuple[str, ...]):
+    # One batch pass over the long-form statements scores every ticker; tickers without data get "No Data".
+    # A failed fetch raises instead of returning and an empty one is not cached, so the next rerun retries.
+    ticker_list = list(tickers)
+    return score_companies_health(ticker_list, *get_AllStatements(ticker_list))
 
 # ----------------------------
 # Sidebar: professional controls
@@ -137,39 +127,14 @@ market = st.sidebar.selectbox("Market", ["US / Global", "India — NSE (.NS)", "
 suffix = "" if market == "US / Global" else (".NS" if "NSE" in market else ".BO")
 
 st.sidebar.markdown("#### Quick pick")
-global_presets = {
-    "Apple": "AAPL",
-    "Microsoft": "MSFT",
-    "Nvidia": "NVDA",
-    "Google": "GOOG",
-    "Amazon": "AMZN",
-}
-india_presets = {
-    "Reliance": f"RELIANCE{suffix}",
-    "TCS": f"TCS{suffix}",
-    "HDFC Bank": f"HDFCBANK{suffix}",
-    "Infosys": f"INFY{suffix}",
-    "ITC": f"ITC{suffix}",
-    "L&T": f"LT{suffix}",
-    "SBI": f"SBIN{suffix}",
-    "Airtel": f"BHARTIARTL{suffix}",
-    "Asian Paints": f"ASIANPAINT{suffix}",
-    "HUL": f"HINDUNILVR{suffix}",
-}
-
-presets = global_presets if market == "US / Global" else india_presets
+presets = _GLOBAL_PRESETS if market == "US / Global" else _india_presets(suffix)
 picked = st.sidebar.multiselect("Presets", list(presets.keys()), default=list(presets.keys())[:2])
 
 st.sidebar.markdown("#### Add tickers")
 manual = st.sidebar.text_input("Comma/space-separated", value="")
 
 base_manual = _clean_ticker_list(manual)
-manual_full = []
-for t in base_manual:
-    if suffix and not t.endswith((".NS", ".BO")):
-        manual_full.append(t + suffix)
-    else:
-        manual_full.append(t)
+manual_full = [t + suffix if suffix and not t.endswith((".NS", ".BO")) else t for t in base_manual]
 
 tickers = _dedup_keep_order([presets[n] for n in picked] + manual_full)
 
@@ -184,6 +149,9 @@ if not tickers:
     st.warning("Select at least one ticker to start.")
     st.stop()
 
+# hashable cache key for the loaders, built once per rerun
+tkey = tuple(tickers)
+
 # ----------------------------
 # Header
 # ----------------------------
@@ -204,20 +172,16 @@ with page[0]:
     st.subheader("Dashboard")
 
     with st.spinner("Loading statements and ratios..."):
-        bs, fs, cf = _load_statements(tuple(tickers))
-        _, _, _, allr = _load_ratios(tuple(tickers))
+        data = _load_all(tkey)
+        bs, fs, cf, allr, ratio_cols = data.bs, data.fs, data.cf, data.allr, data.ratio_cols
 
     # KPI row
     c1, c2, c3, c4 = st.columns(4)
 
     # Health scores
     health_rows = []
-    for t in tickers:
-        try:
-            h = _build_health_for_ticker(t)
-            health_rows.append({"Company": t, "Score": h["score"], "Rating": h["rating"]})
-        except Exception:
-            health_rows.append({"Company": t, "Score": None, "Rating": "No Data"})
+    for t, h in _score_all(tkey).items():
+        health_rows.append({"Company": t, "Score": h.score, "Rating": h.rating})
 
     health_df = pd.DataFrame(health_rows).sort_values(by="Score", ascending=False, na_position="last")
 
@@ -261,11 +225,10 @@ with page[0]:
     st.markdown("##### Quick ratio view (selected)")
     if not allr.empty:
         # Let user choose which ratios to show
-        ratio_cols = [c for c in allr.columns if c != "Company"]
         default_cols = ratio_cols[:6] if len(ratio_cols) >= 6 else ratio_cols
         selected = st.multiselect("Select ratios", ratio_cols, default=default_cols)
         if selected:
-            view = allr[["Company"] + selected].copy()
+            view = allr.loc[:, ["Company"] + selected]
             st.dataframe(view, use_container_width=True, hide_index=True)
 
     st.caption("Data source: Yahoo Finance via yfinance. Some tickers may have missing statement fields.")
@@ -286,7 +249,8 @@ with page[1]:
 with page[2]:
     st.subheader("Ratios")
     with st.spinner("Loading ratios..."):
-        prof, liq, eff, allr = _load_ratios(tuple(tickers))
+        loaded = _load_all(tkey)
+        allr, ratio_cols = loaded.allr, loaded.ratio_cols
 
     st.markdown("##### Complete ratio sheet")
     st.dataframe(allr, use_container_width=True, hide_index=True)
@@ -299,13 +263,11 @@ with page[2]:
     )
 
     st.markdown("##### Ratio explorer")
-    ratio_cols = [c for c in allr.columns if c != "Company"]
     chosen = st.multiselect("Choose ratios to plot", ratio_cols, default=ratio_cols[:3] if ratio_cols else [])
     if chosen:
         # Build a simple line chart from the "allr" sheet if it contains time index.
         # If your ratio sheet isn't time-indexed, we just show bar-like comparison.
-        comp = allr[["Company"] + chosen].copy()
-        comp = comp.set_index("Company")
+        comp = allr.loc[:, ["Company"] + chosen].set_index("Company")
         st.line_chart(comp)  # Streamlit defaults for colors/style
 
 
@@ -317,28 +279,19 @@ with page[3]:
     st.write("Rule-based screening score. Treat as **first-pass filtering**, then validate in annual reports/filings.")
 
     rows = []
-    snapshots = []
     metric_tables = {}
 
     with st.spinner("Scoring companies..."):
-        for t in tickers:
-            try:
-                h = _build_health_for_ticker(t)
-                rows.append({
-                    "Company": t,
-                    "Score": h["score"],
-                    "Rating": h["rating"],
-                    "Top flags": " | ".join(h["flags"][:3]) + (" ..." if len(h["flags"]) > 3 else ""),
-                })
-                snap = h["snapshot"].copy()
-                snap["Company"] = t
-                snapshots.append(snap)
-                metric_tables[t] = pd.DataFrame(
-                    {"Metric": list(h["metric_scores"].keys()), "Score (0-10)": list(h["metric_scores"].values())}
-                )
-            except Exception as e:
-                rows.append({"Company": t, "Score": None, "Rating": "No Data", "Top flags": "Unable to score (missing Yahoo fields)."})
-                metric_tables[t] = pd.DataFrame({"Metric": [], "Score (0-10)": []})
+        by_ticker = _score_all(tkey)
+        for t, h in by_ticker.items():
+            rows.append({
+                "Company": t,
+                "Score": h.score,
+                "Rating": h.rating,
+                "Top flags": " | ".join(h.flags[:3]) + (" ..." if len(h.flags) > 3 else ""),
+            })
+            # only the inspected company's table is ever shown, so build that DataFrame lazily below
+            metric_tables[t] = (list(h.metric_scores.keys()), list(h.metric_scores.values()))
 
     scorecard = pd.DataFrame(rows).sort_values(by="Score", ascending=False, na_position="last")
     st.dataframe(scorecard, use_container_width=True, hide_index=True)
@@ -351,26 +304,40 @@ with page[3]:
 
     if pick:
         try:
-            h = _build_health_for_ticker(pick)
+            # reuse the scorecard's result rather than fetching the ticker again
+            h = by_ticker.get(pick)
+            if h is None:
+                raise LookupError(f"No health result for {pick}")
             a, b, c = st.columns(3)
-            a.metric("Health Score", f"{h['score']}/100")
-            b.metric("Rating", h["rating"])
-            cr = h["snapshot"].get("Current Ratio")
+            a.metric("Health Score", f"{h.score}/100")
+            b.metric("Rating", h.rating)
+            cr = h.snapshot.get("Current Ratio")
             c.metric("Current Ratio", f"{cr:.2f}" if isinstance(cr, (int, float)) and cr == cr else "—")
 
-            if h["flags"]:
-                st.warning("Key flags:\n- " + "\n- ".join(h["flags"]))
+            if h.flags:
+                st.warning("Key flags:\n- " + "\n- ".join(h.flags))
 
             if show_metric:
                 st.markdown("##### Metric breakdown")
-                st.dataframe(metric_tables[pick], use_container_width=True, hide_index=True)
+                metric_names, metric_scores = metric_tables[pick]
+                st.dataframe(
+                    pd.DataFrame({"Metric": metric_names, "Score (0-10)": metric_scores}),
+                    use_container_width=True,
+                    hide_index=True,
+                )
 
             if show_raw:
                 st.markdown("##### Raw snapshot (latest year)")
-                snap = pd.DataFrame([h["snapshot"]]).T.reset_index()
+                snap = pd.DataFrame([h.snapshot]).T.reset_index()
                 snap.columns = ["Line Item", "Value"]
-                snap["Value"] = snap["Value"].map(_fmt_num)
-                st.dataframe(snap, use_container_width=True, hide_index=True)
+                # Keep values numeric so Arrow ships float64 and the column stays sortable; Streamlit formats it.
+                snap["Value"] = pd.to_numeric(snap["Value"], errors="coerce")
+                st.dataframe(
+                    snap,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={"Value": st.column_config.NumberColumn(format="compact")},
+                )
 
         except Exception:
             st.error("Could not build a detailed view for this ticker (Yahoo Finance statement fields missing).")